@@ -1,9 +1,43 @@
 import requests
+import base64
+import hashlib
+import json
 import os
-from pathlib import Path
-from utils.utilidades import printdbg
-from database import get_db_connection, close_db_connection
-from models.credenciais import get_credencial_by_env_key, update_tokens_by_env_key
+import socket
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
+from urllib3.util.request import ACCEPT_ENCODING
+from utils.utilidades import printdbg, is_debug, ttl_cache, TokenBucket
+
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+
+    def _json_dumps_sorted(obj):
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+except ImportError:  # fallback para a stdlib se orjson não estiver instalado
+    def _json_loads(content):
+        return json.loads(content)
+
+    def _json_dumps(obj):
+        return json.dumps(obj).encode("utf-8")
+
+    def _json_dumps_sorted(obj):
+        return json.dumps(obj, sort_keys=True).encode("utf-8")
+
+try:
+    import ijson
+except ImportError:  # streaming do mercado cai no parse completo
+    ijson = None
+from database import DB_POOL
+from models.credenciais import get_credencial_by_env_key, update_tokens_by_env_key, update_last_escala_hash
 
 # Tokens agora são obtidos do banco de dados (tabela 'credenciais').
 
@@ -17,393 +51,588 @@ API_URL_GATO_MESTRE = "https://api.cartola.globo.com/auth/gatomestre/atletas"
 API_URL_REFRESH = "https://api.cartola.globo.com/refresh"
 API_URL_TEAM_DATA = "https://api.cartola.globo.com/auth/time"
 API_URL_SALVAR_TIME = "https://api.cartola.globo.com/auth/time/salvar"
+API_URL_REFRESH_TOKEN = "https://web-api.globoid.globo.com/v1/refresh-token"
 
-def update_env_with_new_key(new_key, env_key="AERO_RBSV"):
-    """[DEPRECATED] Mantido por compatibilidade; não grava mais em .env."""
-    return new_key
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/134.0.0.0 Safari/537.36"
 
-def refresh_access_token(current_token, env_key="AERO_RBSV"):
-    """Atualiza os tokens de acesso via API usando o refresh token."""
-    # Buscar credencial no banco
-    conn = get_db_connection()
-    cred = None
+# Limite de requisições por segundo à API do Cartola (um pouco abaixo do teto tolerado)
+CARTOLA_MAX_RPS = float(os.getenv("CARTOLA_MAX_RPS", 3))
+
+# Timeout padrão (connect, read) em segundos: um upstream travado não segura o worker
+REQUEST_TIMEOUT = (3, 10)
+
+# Conexões keep-alive mantidas por host; chamadores concorrentes não devem passar disso
+SESSION_POOL_MAXSIZE = 32
+
+class _CartolaSession(requests.Session):
+    """
+    Session com timeout padrão em toda requisição e, opcionalmente, um token bucket
+    consultado antes de cada envio.
+    """
+
+    def __init__(self, limiter=None, timeout=REQUEST_TIMEOUT):
+        super().__init__()
+        self.limiter = limiter
+        self.timeout = timeout
+
+    def request(self, *args, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        if self.limiter:
+            self.limiter.acquire()
+        return super().request(*args, **kwargs)
+
+class _NoDelayAdapter(HTTPAdapter):
+    """Adapter que garante TCP_NODELAY: POSTs pequenos (refresh, salvar) saem sem esperar o Nagle."""
+
+    SOCKET_OPTIONS = HTTPConnection.default_socket_options + [
+        opt for opt in [(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)]
+        if opt not in HTTPConnection.default_socket_options
+    ]
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = self.SOCKET_OPTIONS
+        super().init_poolmanager(*args, **kwargs)
+
+def _build_session(limiter=None):
+    """Cria uma Session com pool de conexões (keep-alive), timeout e retry para erros transitórios."""
+    session = _CartolaSession(limiter)
+    session.headers.update({
+        "User-Agent": DEFAULT_USER_AGENT,
+        # Só anuncia br/zstd se o urllib3 conseguir decodificar
+        "Accept-Encoding": ACCEPT_ENCODING,
+    })
+    adapter = _NoDelayAdapter(
+        pool_connections=4,
+        pool_maxsize=SESSION_POOL_MAXSIZE,  # deve cobrir o max_workers de fetch_for_accounts
+        # 429 também entra no backoff (respeitando Retry-After)
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504]),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def _parse_json(response):
+    """Decodifica o corpo JSON direto dos bytes da resposta (orjson quando disponível)."""
     try:
-        cred = get_credencial_by_env_key(conn, env_key)
-    finally:
-        close_db_connection(conn)
+        return _json_loads(response.content)
+    except ValueError as e:
+        # Mantém o mesmo tipo de erro de response.json() para os handlers existentes
+        raise requests.exceptions.JSONDecodeError(str(e), "", 0, response=response)
+
+# Headers estáticos (montados uma vez; por chamada só entra o Authorization)
+_AUTH_HEADERS = {"Accept": "application/json"}
 
-    if not cred:
-        printdbg(f"Erro: Credencial não encontrada para {env_key}")
+_SALVAR_HEADERS = {
+    "Accept": "application/json, text/plain, */*",
+    "Content-Type": "application/json;charset=UTF-8",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Safari/537.36 Edg/139.0.0.0",
+    "Origin": "https://cartola.globo.com",
+    "Referer": "https://cartola.globo.com/",
+    "x-glb-app": "cartola_web",
+    "x-glb-auth": "oidc",
+}
+
+_REFRESH_HEADERS = {
+    "Content-Type": "application/json",
+    "Accept": "*/*",
+    "Accept-Encoding": ACCEPT_ENCODING,
+    "Accept-Language": "pt-BR,pt;q=0.9,en;q=0.8,en-GB;q=0.7,en-US;q=0.6",
+    "Origin": "https://cartola.globo.com",
+    "Referer": "https://cartola.globo.com/",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36 Edg/138.0.0.0",
+    "Sec-Ch-Ua": "\"Not)A;Brand\";v=\"8\", \"Chromium\";v=\"138\", \"Microsoft Edge\";v=\"138\"",
+    "Sec-Ch-Ua-Mobile": "?0",
+    "Sec-Ch-Ua-Platform": "\"Windows\"",
+    "Sec-Fetch-Dest": "empty",
+    "Sec-Fetch-Mode": "cors",
+    "Sec-Fetch-Site": "same-site"
+}
+
+# Sessões compartilhadas: reaproveitam a conexão TCP+TLS entre chamadas.
+# O refresh de token fica numa sessão separada por ser outro host (globoid).
+SESSION = _build_session(limiter=TokenBucket(rate=CARTOLA_MAX_RPS))
+REFRESH_SESSION = _build_session(limiter=TokenBucket(rate=CARTOLA_MAX_RPS))
+
+# Margem (segundos) para renovar o access token antes de ele expirar
+TOKEN_REFRESH_MARGIN = 60
+
+# Expiração conhecida de cada token: {env_key: (access_token, exp)}
+_TOKEN_EXP = {}
+
+def _decode_token_exp(token):
+    """Extrai o claim 'exp' do JWT (sem validar assinatura). Retorna None se não conseguir."""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        exp = _json_loads(base64.urlsafe_b64decode(payload)).get("exp")
+        return int(exp) if exp is not None else None
+    except (AttributeError, IndexError, TypeError, ValueError):
         return None
 
-    refresh_token = cred.get("refresh_token")
-    id_token = cred.get("id_token")
-    if not current_token:
-        current_token = cred.get("access_token")
-    if not current_token:
-        printdbg(f"Erro: Nenhum access token disponível para refresh em {env_key}")
+def _is_token_expired(token, exp=None):
+    """True se o token expira em menos de TOKEN_REFRESH_MARGIN segundos."""
+    if exp is None:
+        exp = _decode_token_exp(token)
+    if exp is None:
+        # Sem 'exp' legível: deixa o fluxo reativo (401) decidir
+        return False
+    return exp - time.time() < TOKEN_REFRESH_MARGIN
+
+def _token_exp(env_key, token, persisted_exp=None):
+    """Retorna o exp do token usando o cache/banco antes de decodificar o JWT."""
+    cached = _TOKEN_EXP.get(env_key)
+    if cached and cached[0] == token:
+        return cached[1]
+    exp = persisted_exp if persisted_exp is not None else _decode_token_exp(token)
+    _TOKEN_EXP[env_key] = (token, exp)
+    return exp
+
+# Cache em memória das credenciais: {env_key: dict da tabela acf_credenciais}
+_CRED_CACHE = {}
+_CRED_LOCK = threading.RLock()
+
+def _get_cred(env_key, reload=False):
+    """Retorna a credencial do cache; consulta o banco só na primeira vez (ou com reload=True)."""
+    with _CRED_LOCK:
+        cred = None if reload else _CRED_CACHE.get(env_key)
+        if cred is None:
+            with DB_POOL.acquire() as conn:
+                cred = get_credencial_by_env_key(conn, env_key)
+            if cred:
+                _CRED_CACHE[env_key] = cred
+            else:
+                _CRED_CACHE.pop(env_key, None)
+        return cred
+
+def _update_cred(env_key, **tokens):
+    """Grava os tokens no banco e atualiza a entrada do cache no lugar."""
+    with _CRED_LOCK:
+        with DB_POOL.acquire() as conn:
+            update_tokens_by_env_key(conn, env_key, **tokens)
+        cred = _CRED_CACHE.get(env_key)
+        if cred is not None:
+            cred.update({k: v for k, v in tokens.items() if v is not None})
+            if tokens.get("access_token") is not None:
+                cred["access_token_exp"] = tokens.get("access_token_exp")
+
+# Locks de refresh por env_key (single-flight)
+_REFRESH_LOCKS = defaultdict(threading.Lock)
+
+def _refresh_lock(env_key):
+    with _CRED_LOCK:
+        return _REFRESH_LOCKS[env_key]
+
+def _ensure_valid_token(env_key, access_token=None):
+    """Retorna um access token utilizável, renovando antes do 401 se estiver para expirar."""
+    token = access_token
+    persisted_exp = None
+    if not token:
+        cred = _get_cred(env_key)
+        if cred:
+            token = cred.get("access_token")
+            persisted_exp = cred.get("access_token_exp")
+    if not token:
         return None
-    client_id = "cartola-web@apps.globoid"
-
-    url = "https://web-api.globoid.globo.com/v1/refresh-token"
-    headers = {
-        "Content-Type": "application/json",
-        "Accept": "*/*",
-        "Accept-Encoding": "gzip, deflate, br, zstd",
-        "Accept-Language": "pt-BR,pt;q=0.9,en;q=0.8,en-GB;q=0.7,en-US;q=0.6",
-        "Origin": "https://cartola.globo.com",
-        "Referer": "https://cartola.globo.com/",
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36 Edg/138.0.0.0",
-        "Sec-Ch-Ua": "\"Not)A;Brand\";v=\"8\", \"Chromium\";v=\"138\", \"Microsoft Edge\";v=\"138\"",
-        "Sec-Ch-Ua-Mobile": "?0",
-        "Sec-Ch-Ua-Platform": "\"Windows\"",
-        "Sec-Fetch-Dest": "empty",
-        "Sec-Fetch-Mode": "cors",
-        "Sec-Fetch-Site": "same-site"
-    }
-    payload = {
-        "client_id": client_id,
-        "refresh_token": refresh_token,
-        "access_token": current_token,
-        "id_token": id_token
-    }
 
-    try:
-        response = requests.post(url, headers=headers, json=payload)
-        if response.status_code == 200:
-            tokens = response.json()
-            new_access_token = tokens.get("access_token")
-            new_refresh_token = tokens.get("refresh_token")
-            new_id_token = tokens.get("id_token")
-
-            # Persistir no banco
-            conn2 = get_db_connection()
-            try:
-                update_tokens_by_env_key(conn2, env_key, access_token=new_access_token, refresh_token=new_refresh_token, id_token=new_id_token)
-            finally:
-                close_db_connection(conn2)
-            printdbg(f"Token atualizado com sucesso para {env_key}")
-            return new_access_token
-        else:
-            error_msg = f"Falha no refresh ({response.status_code})"
-            try:
-                error_body = response.json()
-                error_msg += f": {error_body}"
-            except:
-                error_msg += f". Resposta: {response.text[:200]}"
-            printdbg(error_msg)
+    if _is_token_expired(token, _token_exp(env_key, token, persisted_exp)):
+        printdbg(f"Token de {env_key} expira em breve. Renovando antes da requisição...")
+        new_token = refresh_access_token(token, env_key)
+        if new_token:
+            return new_token
+    return token
+
+def refresh_access_token(current_token, env_key="AERO_RBSV"):
+    """
+    Atualiza os tokens de acesso via API usando o refresh token.
+    Single-flight: só uma renovação por env_key acontece por vez; quem esperar o lock
+    reaproveita o token renovado em vez de repetir o POST (e invalidar o refresh token rotacionado).
+    """
+    with _refresh_lock(env_key):
+        # Relê do banco: outro processo pode ter rotacionado o refresh token
+        cred = _get_cred(env_key, reload=True)
+
+        if not cred:
+            printdbg(f"Erro: Credencial não encontrada para {env_key}")
             return None
-    except requests.exceptions.JSONDecodeError as e:
-        printdbg(f"Erro ao parsear resposta do refresh: {e}")
-        if hasattr(e, 'response') and e.response is not None:
-            printdbg(f"Resposta recebida: {e.response.text[:200]}")
-        return None
+
+        # Outra thread pode ter renovado enquanto esperávamos o lock
+        stored_token = cred.get("access_token")
+        if current_token and stored_token and stored_token != current_token \
+                and not _is_token_expired(stored_token, cred.get("access_token_exp")):
+            printdbg(f"Token de {env_key} já renovado por outra chamada")
+            return stored_token
+
+        refresh_token = cred.get("refresh_token")
+        id_token = cred.get("id_token")
+        if not current_token:
+            current_token = cred.get("access_token")
+        if not current_token:
+            printdbg(f"Erro: Nenhum access token disponível para refresh em {env_key}")
+            return None
+        client_id = "cartola-web@apps.globoid"
+
+        payload = {
+            "client_id": client_id,
+            "refresh_token": refresh_token,
+            "access_token": current_token,
+            "id_token": id_token
+        }
+
+        try:
+            response = REFRESH_SESSION.post(API_URL_REFRESH_TOKEN, headers=_REFRESH_HEADERS, data=_json_dumps(payload))
+            if response.status_code == 200:
+                tokens = _parse_json(response)
+                new_access_token = tokens.get("access_token")
+                new_refresh_token = tokens.get("refresh_token")
+                new_id_token = tokens.get("id_token")
+                new_exp = _decode_token_exp(new_access_token) if new_access_token else None
+                if new_access_token:
+                    _TOKEN_EXP[env_key] = (new_access_token, new_exp)
+
+                # Persistir no banco (e no cache de credenciais)
+                _update_cred(env_key, access_token=new_access_token, refresh_token=new_refresh_token, id_token=new_id_token, access_token_exp=new_exp)
+                printdbg(f"Token atualizado com sucesso para {env_key}")
+                return new_access_token
+            else:
+                error_msg = f"Falha no refresh ({response.status_code})"
+                try:
+                    error_body = _parse_json(response)
+                    error_msg += f": {error_body}"
+                except:
+                    error_msg += f". Resposta: {response.text[:200]}"
+                printdbg(error_msg)
+                return None
+        except requests.exceptions.JSONDecodeError as e:
+            printdbg(f"Erro ao parsear resposta do refresh: {e}")
+            if hasattr(e, 'response') and e.response is not None:
+                printdbg(f"Resposta recebida: {e.response.text[:200]}")
+            return None
+        except requests.exceptions.RequestException as e:
+            printdbg(f"Erro de rede no refresh: {e}")
+            if hasattr(e, 'response') and e.response is not None:
+                printdbg(f"Status: {e.response.status_code}, Resposta: {e.response.text[:200]}")
+            return None
+
+# TTLs (segundos) do cache dos endpoints públicos
+MERCADO_CACHE_TTL = 30
+STATUS_CACHE_TTL = 30
+STATUS_CACHE_MAX_TTL = 300
+ESQUEMAS_CACHE_TTL = 3600
+RODADA_CACHE_TTL = 60
+
+def _status_ttl(status):
+    """Com o mercado aberto o status só muda no fechamento: estende o TTL até lá (com teto)."""
+    if not isinstance(status, dict):
+        return STATUS_CACHE_TTL
+    fechamento = (status.get("fechamento") or {}).get("timestamp")
+    if status.get("status_mercado") == 1 and fechamento:
+        restante = fechamento - time.time()
+        if restante > STATUS_CACHE_TTL:
+            return min(restante, STATUS_CACHE_MAX_TTL)
+    return STATUS_CACHE_TTL
+
+def fetch_cartola_data(stream=False):
+    """
+    Obtém dados do mercado (não requer autenticação).
+    Com stream=True retorna um gerador que produz os atletas um a um, parseados
+    incrementalmente com ijson, sem materializar o payload inteiro em memória.
+    """
+    if stream:
+        return _iter_atletas_mercado()
+    return _fetch_mercado()
+
+def _iter_atletas_mercado():
+    if ijson is None:
+        # Sem ijson: mesmo contrato (gerador de atletas), porém a partir do payload completo
+        data = _fetch_mercado()
+        yield from (data or {}).get("atletas") or []
+        return
+    try:
+        with SESSION.get(API_URL_MERCADO, stream=True) as response:
+            response.raise_for_status()
+            # Descomprime gzip/br de forma transparente antes do parser
+            response.raw.decode_content = True
+            yield from ijson.items(response.raw, "atletas.item", use_float=True)
     except requests.exceptions.RequestException as e:
-        printdbg(f"Erro de rede no refresh: {e}")
-        if hasattr(e, 'response') and e.response is not None:
-            printdbg(f"Status: {e.response.status_code}, Resposta: {e.response.text[:200]}")
-        return None
+        print(f"Erro ao consultar a API Cartola (mercado, stream): {e}")
 
-def fetch_cartola_data():
-    """Obtém dados do mercado (não requer autenticação)."""
+# Validadores da última resposta 200 por URL: {url: (etag, last_modified, dados)}
+_CONDITIONAL = {}
+
+def _conditional_get(url):
+    """
+    GET condicional (If-None-Match / If-Modified-Since). Em 304 devolve o MESMO objeto
+    da resposta anterior, então quem guardou a referência sabe que nada mudou (`is`).
+    """
+    headers = {}
+    cached = _CONDITIONAL.get(url)
+    if cached:
+        etag, last_modified, _ = cached
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+    response = SESSION.get(url, headers=headers)
+    if response.status_code == 304 and cached:
+        return cached[2]
+    response.raise_for_status()
+    data = _parse_json(response)
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if etag or last_modified:
+        _CONDITIONAL[url] = (etag, last_modified, data)
+    return data
+
+@ttl_cache(seconds=MERCADO_CACHE_TTL)
+def _fetch_mercado():
     try:
-        response = requests.get(API_URL_MERCADO)
-        response.raise_for_status()
-        data = response.json()
-        return data
+        return _conditional_get(API_URL_MERCADO)
     except requests.exceptions.RequestException as e:
         print(f"Erro ao consultar a API Cartola (mercado): {e}")
         return None
 
+@ttl_cache(seconds=STATUS_CACHE_TTL, ttl_func=_status_ttl)
 def fetch_status_data():
     """Obtém o status do mercado (não requer autenticação)."""
     try:
-        response = requests.get(API_URL_STATUS)
+        response = SESSION.get(API_URL_STATUS)
         response.raise_for_status()
-        return response.json()
+        return _parse_json(response)
     except requests.exceptions.RequestException as e:
         print(f"Erro ao consultar a API Cartola (status): {e}")
         return None
 
+@ttl_cache(seconds=RODADA_CACHE_TTL)
 def fetch_pontuados_data(rodada):
     """Obtém dados de atletas pontuados para a rodada especificada (não requer autenticação)."""
     try:
-        response = requests.get(API_URL_PONTUADOS.format(rodada))
+        response = SESSION.get(API_URL_PONTUADOS.format(rodada))
         response.raise_for_status()
-        return response.json()
+        return _parse_json(response)
     except requests.exceptions.RequestException as e:
         print(f"Erro ao consultar a API Cartola (pontuados, rodada {rodada}): {e}")
         return None
 
+@ttl_cache(seconds=RODADA_CACHE_TTL)
 def fetch_partidas_data(rodada):
     """Obtém dados das partidas da rodada especificada (não requer autenticação)."""
     try:
-        response = requests.get(API_URL_PARTIDAS.format(rodada))
+        response = SESSION.get(API_URL_PARTIDAS.format(rodada))
         response.raise_for_status()
-        return response.json()
+        return _parse_json(response)
     except requests.exceptions.RequestException as e:
         print(f"Erro ao consultar a API Cartola (partidas, rodada {rodada}): {e}")
         return None
 
+@ttl_cache(seconds=ESQUEMAS_CACHE_TTL)
 def fetch_esquemas_data():
     """Obtém dados dos esquemas disponíveis (não requer autenticação)."""
     try:
-        response = requests.get(API_URL_ESQUEMAS)
+        response = SESSION.get(API_URL_ESQUEMAS)
         response.raise_for_status()
-        return response.json()
+        return _parse_json(response)
     except requests.exceptions.RequestException as e:
         print(f"Erro ao consultar a API Cartola (esquemas): {e}")
         return None
 
-def fetch_destaques_data(access_token=None, env_key="AERO_RBSV"):
-    """Obtém dados de destaques do mercado."""
-    token = access_token
-    if not token:
-        conn = get_db_connection()
-        try:
-            cred = get_credencial_by_env_key(conn, env_key)
-            token = cred.get("access_token") if cred else None
-        finally:
-            close_db_connection(conn)
+def fetch_all(rodada):
+    """
+    Busca mercado, status, pontuados, partidas e esquemas em paralelo.
+    As chamadas são independentes e limitadas por I/O, então o tempo total fica
+    próximo da mais lenta em vez da soma de todas.
+    Retorna um dict com as chaves 'mercado', 'status', 'pontuados', 'partidas' e 'esquemas'.
+    """
+    tarefas = {
+        "mercado": (fetch_cartola_data, ()),
+        "status": (fetch_status_data, ()),
+        "pontuados": (fetch_pontuados_data, (rodada,)),
+        "partidas": (fetch_partidas_data, (rodada,)),
+        "esquemas": (fetch_esquemas_data, ()),
+    }
+    with ThreadPoolExecutor(max_workers=len(tarefas)) as executor:
+        futures = {nome: executor.submit(func, *args) for nome, (func, args) in tarefas.items()}
+        return {nome: future.result() for nome, future in futures.items()}
+
+def authed_request(method, url, env_key="AERO_RBSV", access_token=None, headers=None, **kwargs):
+    """
+    Faz uma requisição autenticada pela Session compartilhada.
+    Garante um token válido antes de enviar e, se mesmo assim receber 401,
+    renova o token e repete a requisição uma única vez.
+    Retorna o Response (sem raise_for_status) ou None se não houver token disponível.
+    Erros de rede propagam como requests.exceptions.RequestException.
+    """
+    token = _ensure_valid_token(env_key, access_token)
     if not token:
         printdbg(f"Erro: Access token não encontrado para {env_key}")
         return None
 
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/json",
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/134.0.0.0 Safari/537.36"
-    }
+    request_headers = dict(headers or {})
+    request_headers["Authorization"] = f"Bearer {token}"
+    response = SESSION.request(method, url, headers=request_headers, **kwargs)
+    if response.status_code != 401:
+        return response
+
+    printdbg(f"Token expirado ({env_key}). Atualizando...")
+    new_token = refresh_access_token(token, env_key)
+    if not new_token:
+        printdbg(f"Refresh de token falhou ({env_key}).")
+        return response
+    request_headers["Authorization"] = f"Bearer {new_token}"
+    return SESSION.request(method, url, headers=request_headers, **kwargs)
 
+def _bearer_token(response):
+    """Token efetivamente usado na requisição (pode ter sido renovado pelo authed_request)."""
+    auth = response.request.headers.get("Authorization", "")
+    return auth[len("Bearer "):] if auth.startswith("Bearer ") else None
+
+def _log_request_error(contexto, env_key, e):
+    printdbg(f"Erro em {contexto} ({env_key}): {e}")
+    if e.response is not None:
+        printdbg(f"Status code: {e.response.status_code}, Response: {e.response.text[:200]}")
+
+def fetch_destaques_data(access_token=None, env_key="AERO_RBSV"):
+    """Obtém dados de destaques do mercado."""
     try:
-        response = requests.get(API_URL_DESTAQUES, headers=headers)
+        response = authed_request("GET", API_URL_DESTAQUES, env_key, access_token, headers=_AUTH_HEADERS)
+        if response is None:
+            return None
         response.raise_for_status()
-        data = response.json()
+        data = _parse_json(response)
         printdbg(f"Destaques API retornou: tipo={type(data)}, tamanho={len(data) if isinstance(data, list) else 'N/A'}")
         return data
     except requests.exceptions.RequestException as e:
-        if hasattr(e, 'response') and e.response is not None and e.response.status_code == 401:
-            printdbg(f"Token expirado ({env_key}). Atualizando...")
-            new_token = refresh_access_token(token, env_key)
-            if new_token:
-                headers["Authorization"] = f"Bearer {new_token}"
-                try:
-                    response = requests.get(API_URL_DESTAQUES, headers=headers)
-                    response.raise_for_status()
-                    data = response.json()
-                    printdbg(f"Destaques API retornou (após refresh): tipo={type(data)}, tamanho={len(data) if isinstance(data, list) else 'N/A'}")
-                    return data
-                except requests.exceptions.RequestException as e:
-                    printdbg(f"Falha pós-refresh em destaques ({env_key}): {e}")
-                    if hasattr(e, 'response') and e.response is not None:
-                        printdbg(f"Status code: {e.response.status_code}, Response: {e.response.text[:200]}")
-                    return None
-            else:
-                printdbg(f"Refresh de token falhou ({env_key}).")
-                return None
-        else:
-            printdbg(f"Erro em destaques ({env_key}): {e}")
-            if hasattr(e, 'response') and e.response is not None:
-                printdbg(f"Status code: {e.response.status_code}, Response: {e.response.text[:200]}")
-            return None
+        _log_request_error("destaques", env_key, e)
+        return None
 
 def fetch_gato_mestre_data(access_token=None, env_key="AERO_RBSV"):
     """Obtém dados do Gato Mestre."""
-    token = access_token
-    if not token:
-        conn = get_db_connection()
-        try:
-            cred = get_credencial_by_env_key(conn, env_key)
-            token = cred.get("access_token") if cred else None
-        finally:
-            close_db_connection(conn)
-    if not token:
-        printdbg(f"Erro: Access token não encontrado para {env_key}")
-        return None
-
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/json",
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/134.0.0.0 Safari/537.36"
-    }
-
     try:
-        response = requests.get(API_URL_GATO_MESTRE, headers=headers)
+        response = authed_request("GET", API_URL_GATO_MESTRE, env_key, access_token, headers=_AUTH_HEADERS)
+        if response is None:
+            return None
         response.raise_for_status()
-        return response.json()
+        return _parse_json(response)
     except requests.exceptions.RequestException as e:
-        if hasattr(e.response, 'status_code') and e.response.status_code == 401:
-            printdbg(f"Token expirado para {env_key}. Tentando atualizar o token...")
-            new_token = refresh_access_token(token, env_key)
-            if new_token:
-                headers["Authorization"] = f"Bearer {new_token}"
-                try:
-                    response = requests.get(API_URL_GATO_MESTRE, headers=headers)
-                    response.raise_for_status()
-                    return response.json()
-                except requests.exceptions.RequestException as e:
-                    printdbg(f"Falha pós-refresh em gato_mestre ({env_key}): {e}")
-                    return None
-            else:
-                printdbg(f"Falha ao atualizar o token para {env_key}.")
-                return None
-        else:
-            printdbg(f"Erro em gato_mestre ({env_key}): {e}")
-            return None
+        _log_request_error("gato_mestre", env_key, e)
+        return None
 
 def fetch_team_data(access_token=None, env_key="AERO_RBSV"):
-    """Obtém os dados do time do usuário, incluindo o patrimônio."""
+    """Obtém os dados do time do usuário, incluindo o patrimônio. Retorna (dados, token usado)."""
     printdbg(f"Buscando dados do time ({env_key})")
-    token = access_token
-    if not token:
-        conn = get_db_connection()
-        try:
-            cred = get_credencial_by_env_key(conn, env_key)
-            token = cred.get("access_token") if cred else None
-        finally:
-            close_db_connection(conn)
-    if not token:
-        printdbg(f"Erro: Access token não encontrado para {env_key}")
+    try:
+        response = authed_request("GET", API_URL_TEAM_DATA, env_key, access_token, headers=_AUTH_HEADERS)
+        if response is None:
+            return None, None
+        response.raise_for_status()
+        return _parse_json(response), _bearer_token(response)
+    except requests.exceptions.RequestException as e:
+        _log_request_error("time", env_key, e)
         return None, None
 
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/json",
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/134.0.0.0 Safari/537.36"
-    }
+# Hash da última escalação aceita por conta: {env_key: hexdigest}
+_LAST_SAVED = {}
 
+def _escala_hash(time_para_escalacao):
+    """Hash estável da escalação; inclui a rodada para não pular o envio numa rodada nova."""
+    status = fetch_status_data() or {}
+    chave = {"rodada": status.get("rodada_atual"), "time": time_para_escalacao}
+    return hashlib.blake2b(_json_dumps_sorted(chave), digest_size=16).hexdigest()
+
+def _last_saved_hash(env_key):
+    if env_key not in _LAST_SAVED:
+        cred = _get_cred(env_key)
+        _LAST_SAVED[env_key] = cred.get("last_escala_hash") if cred else None
+    return _LAST_SAVED[env_key]
+
+def _remember_saved_hash(env_key, escala_hash):
+    _LAST_SAVED[env_key] = escala_hash
     try:
-        response = requests.get(API_URL_TEAM_DATA, headers=headers)
-        response.raise_for_status()
-        return response.json(), token
-    except requests.exceptions.RequestException as e:
-        if hasattr(e.response, 'status_code') and e.response.status_code == 401:
-            printdbg(f"Token expirado para {env_key}. Tentando atualizar o token...")
-            new_token = refresh_access_token(token, env_key)
-            if new_token:
-                headers["Authorization"] = f"Bearer {new_token}"
-                try:
-                    response = requests.get(API_URL_TEAM_DATA, headers=headers)
-                    response.raise_for_status()
-                    return response.json(), new_token
-                except requests.exceptions.RequestException as e:
-                    printdbg(f"Falha pós-refresh em time ({env_key}): {e}")
-                    return None, None
-            else:
-                printdbg(f"Falha ao atualizar o token para {env_key}.")
-                return None, None
-        else:
-            printdbg(f"Erro em time ({env_key}): {e}")
-            return None, None
+        with DB_POOL.acquire() as conn:
+            update_last_escala_hash(conn, env_key, escala_hash)
+        with _CRED_LOCK:
+            if env_key in _CRED_CACHE:
+                _CRED_CACHE[env_key]["last_escala_hash"] = escala_hash
+    except Exception as e:
+        printdbg(f"Não foi possível persistir o hash da escalação ({env_key}): {e}")
+
+def _body_preview(response, limit=500):
+    """Prévia do corpo para logs; decodifica só os primeiros bytes (sem materializar response.text)."""
+    content = response.content or b""
+    preview = content[:limit].decode("utf-8", "replace")
+    return preview + "..." if len(content) > limit else preview
 
 def salvar_time_no_cartola(time_para_escalacao, access_token=None, env_key="AERO_RBSV"):
-    """Envia a escalação para a API do Cartola FC."""
+    """
+    Envia a escalação para a API do Cartola FC.
+    Se o payload for idêntico ao último aceito para a conta (na mesma rodada), não reenvia.
+    """
+    escala_hash = _escala_hash(time_para_escalacao)
+    if _last_saved_hash(env_key) == escala_hash:
+        printdbg(f"Escalação idêntica à última salva ({env_key}); envio ignorado")
+        return True
+
     printdbg(f"Enviando escalação ({env_key})")
-    token = access_token
-    if not token:
-        conn = get_db_connection()
-        try:
-            cred = get_credencial_by_env_key(conn, env_key)
-            token = cred.get("access_token") if cred else None
-        finally:
-            close_db_connection(conn)
-    if not token:
-        printdbg(f"Erro: Access token não encontrado para {env_key}")
+    try:
+        response = authed_request("POST", API_URL_SALVAR_TIME, env_key, access_token, headers=_SALVAR_HEADERS, data=_json_dumps(time_para_escalacao))
+    except requests.exceptions.RequestException as e:
+        printdbg(f"Erro ao escalar ({env_key}): {e}")
+        if e.response is not None and is_debug():
+            printdbg(f"HTTP {e.response.status_code} corpo: {_body_preview(e.response)}")
+        printdbg(f"Payload enviado: {time_para_escalacao}")
+        return False
+    if response is None:
         return False
 
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/json, text/plain, */*",
-        "Content-Type": "application/json;charset=UTF-8",
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Safari/537.36 Edg/139.0.0.0",
-        "Origin": "https://cartola.globo.com",
-        "Referer": "https://cartola.globo.com/",
-        "x-glb-app": "cartola_web",
-        "x-glb-auth": "oidc",
-    }
-
+    status = response.status_code
+    # Tentar JSON; se falhar, manter texto cru
     try:
-        response = requests.post(API_URL_SALVAR_TIME, json=time_para_escalacao, headers=headers)
-        status = response.status_code
-        # Tentar JSON; se falhar, manter texto cru
-        try:
-            data = response.json()
-        except Exception:
-            data = None
-        body_preview = (response.text[:500] + ('...' if len(response.text) > 500 else '')) if response.text else ''
-        if status == 401:
-            # Tratar como erro de token e fazer refresh abaixo
-            raise requests.exceptions.HTTPError(response=response)
-
-        if 200 <= status < 300:
-            if isinstance(data, dict) and data.get("mensagem") == "Time Escalado! Boa Sorte!":
-                printdbg("Escalação bem-sucedida:", data["mensagem"]) 
-                return True
-            else:
-                # 2xx mas conteúdo inesperado
-                printdbg("Erro na escalação:", (data.get("mensagem") if isinstance(data, dict) else None) or "Resposta inesperada")
-                if isinstance(data, dict):
-                    if "erros" in data:
-                        printdbg("Detalhes de erro:", data["erros"])
-                    printdbg(f"Resposta API (resumo): {data}")
-                else:
-                    printdbg(f"Resposta não-JSON (preview): {body_preview}")
-                printdbg(f"HTTP {status}")
-                printdbg(f"Payload enviado: {time_para_escalacao}")
-                return False
-        else:
-            # 4xx/5xx
-            printdbg(f"Falha HTTP ao escalar: {status}")
-            if isinstance(data, dict):
-                # Mensagens de erro apenas em debug
-                printdbg("Erro na escalação:", data.get("mensagem", ""))
-                if "erros" in data:
-                    printdbg("Detalhes de erro:", data["erros"])
-                printdbg(f"Resposta JSON (resumo): {data}")
-            else:
-                # Não-JSON: apenas em debug
-                printdbg(f"Erro HTTP {status} corpo (preview): {body_preview}")
-            printdbg(f"Payload enviado: {time_para_escalacao}")
-            if status == 409:
-                printdbg("Erro 409: Conflito na escalação. Possíveis causas: time já escalado, rodada fechada ou escalação inválida.")
-            return False
-    except requests.exceptions.RequestException as e:
-        if hasattr(e.response, 'status_code') and e.response.status_code == 401:
-            printdbg(f"Token expirado para {env_key}. Tentando atualizar o token...")
-            new_token = refresh_access_token(token, env_key)
-            if new_token:
-                headers["Authorization"] = f"Bearer {new_token}"
-                try:
-                    response = requests.post(API_URL_SALVAR_TIME, json=time_para_escalacao, headers=headers)
-                    status = response.status_code
-                    try:
-                        data = response.json()
-                    except Exception:
-                        data = None
-                    body_preview = (response.text[:500] + ('...' if len(response.text) > 500 else '')) if response.text else ''
-                    if 200 <= status < 300 and isinstance(data, dict) and data.get("mensagem") == "Time Escalado! Boa Sorte!":
-                        printdbg("Escalação bem-sucedida:", data["mensagem"]) 
-                        return True
-                    else:
-                        printdbg("Erro na escalação após refresh:", (data.get("mensagem") if isinstance(data, dict) else None) or "Resposta inesperada")
-                        printdbg(f"HTTP {status}")
-                        if isinstance(data, dict):
-                            if "erros" in data:
-                                printdbg("Detalhes de erro:", data["erros"]) 
-                            printdbg(f"Resposta API (resumo): {data}")
-                        else:
-                            printdbg(f"Erro HTTP {status} corpo (preview): {body_preview}")
-                        printdbg(f"Payload enviado: {time_para_escalacao}")
-                        return False
-                except requests.exceptions.RequestException as e:
-                    printdbg(f"Falha pós-refresh em salvar_time ({env_key}): {e}")
-                    return False
-            else:
-                printdbg(f"Falha ao atualizar o token para {env_key}.")
-                return False
-        else:
-            printdbg(f"Erro ao escalar ({env_key}): {e}")
-            if hasattr(e, 'response') and e.response is not None:
-                printdbg(f"HTTP {e.response.status_code} corpo: {(e.response.text[:500] + '...') if e.response.text and len(e.response.text) > 500 else e.response.text}")
-            printdbg(f"Payload enviado: {time_para_escalacao}")
-            return False
+        data = _parse_json(response)
+    except Exception:
+        data = None
+
+    if 200 <= status < 300:
+        if isinstance(data, dict) and data.get("mensagem") == "Time Escalado! Boa Sorte!":
+            printdbg("Escalação bem-sucedida:", data["mensagem"]) 
+            _remember_saved_hash(env_key, escala_hash)
+            return True
+        # 2xx mas conteúdo inesperado
+        printdbg("Erro na escalação:", (data.get("mensagem") if isinstance(data, dict) else None) or "Resposta inesperada")
+        if isinstance(data, dict):
+            if "erros" in data:
+                printdbg("Detalhes de erro:", data["erros"])
+            printdbg(f"Resposta API (resumo): {data}")
+        elif is_debug():
+            printdbg(f"Resposta não-JSON (preview): {_body_preview(response)}")
+        printdbg(f"HTTP {status}")
+        printdbg(f"Payload enviado: {time_para_escalacao}")
+        return False
+
+    # 4xx/5xx (inclui 401 quando o refresh do token falhou)
+    printdbg(f"Falha HTTP ao escalar: {status}")
+    if isinstance(data, dict):
+        # Mensagens de erro apenas em debug
+        printdbg("Erro na escalação:", data.get("mensagem", ""))
+        if "erros" in data:
+            printdbg("Detalhes de erro:", data["erros"])
+        printdbg(f"Resposta JSON (resumo): {data}")
+    elif is_debug():
+        # Não-JSON: apenas em debug
+        printdbg(f"Erro HTTP {status} corpo (preview): {_body_preview(response)}")
+    printdbg(f"Payload enviado: {time_para_escalacao}")
+    if status == 409:
+        printdbg("Erro 409: Conflito na escalação. Possíveis causas: time já escalado, rodada fechada ou escalação inválida.")
+    return False
+
+def fetch_for_accounts(fn, env_keys, max_workers=16):
+    """
+    Executa um fetcher autenticado (ex.: fetch_destaques_data) para várias contas em paralelo.
+    Usa a Session compartilhada (thread-safe entre conexões do pool).
+    Retorna {env_key: resultado}.
+    """
+    env_keys = list(env_keys)
+    if not env_keys:
+        return {}
+    workers = min(max_workers, len(env_keys))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        resultados = executor.map(lambda env_key: fn(env_key=env_key), env_keys)
+        return dict(zip(env_keys, resultados))
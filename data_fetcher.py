@@ -13,16 +13,20 @@ Funcionalidades:
 import os
 import time
 import logging
+from logging.handlers import RotatingFileHandler
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from typing import Optional, Dict, Any
 from functools import wraps
+from contextlib import contextmanager
 import requests
 import pytz
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 
-from database import get_db_connection, close_db_connection, initialize_database
-from utils.utilidades import printdbg
+from database import DB_POOL, initialize_database, fast_ingest_tx
+from utils.utilidades import printdbg, TokenBucket, get_temporada_atual
 from api_cartola import (
     fetch_cartola_data,
     fetch_status_data,
@@ -49,7 +53,8 @@ logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.FileHandler('data_fetcher.log'),
+        # Rotaciona em 10 MB; delay=True só abre o arquivo no primeiro registro
+        RotatingFileHandler('data_fetcher.log', maxBytes=10_000_000, backupCount=3, delay=True),
         logging.StreamHandler()
     ]
 )
@@ -65,36 +70,88 @@ def get_brasilia_datetime() -> str:
 
 # Rate limiting simples
 class RateLimiter:
-    """Limita a taxa de requisições para evitar rate limit da API"""
+    """
+    Limita a taxa de requisições para evitar rate limit da API.
+    Token bucket (O(1) por chamada, relógio monotônico): rajadas de até max_calls,
+    reabastecendo max_calls tokens por período. Thread-safe.
+    """
     def __init__(self, max_calls: int = 10, period: float = 1.0):
         self.max_calls = max_calls
         self.period = period
-        self.calls = []
+        self.bucket = TokenBucket(rate=max_calls / period, capacity=max_calls)
     
     def __call__(self, func):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            now = time.time()
-            # Remove chamadas antigas do período
-            self.calls = [call_time for call_time in self.calls if now - call_time < self.period]
-            
-            # Se excedeu o limite, espera
-            if len(self.calls) >= self.max_calls:
-                sleep_time = self.period - (now - self.calls[0])
-                if sleep_time > 0:
-                    logger.info(f"Rate limit atingido. Aguardando {sleep_time:.2f}s...")
-                    time.sleep(sleep_time)
-                    # Limpa a lista novamente após esperar
-                    now = time.time()
-                    self.calls = [call_time for call_time in self.calls if now - call_time < self.period]
-            
-            self.calls.append(time.time())
+            waited = self.bucket.acquire()
+            if waited > 0:
+                logger.info("Rate limit atingido. Aguardou %.2fs", waited)
             return func(*args, **kwargs)
         return wrapper
 
 # Instância global do rate limiter (10 requisições por segundo)
 rate_limiter = RateLimiter(max_calls=10, period=1.0)
 
+# Intervalo do ciclo enquanto o mercado está fechado (jogos em andamento), em minutos
+CLOSED_MARKET_INTERVAL_MINUTES = int(os.getenv('CLOSED_MARKET_INTERVAL_MINUTES', 30))
+
+# Por quanto tempo confiar que não há rodadas de partidas faltantes antes de consultar de novo (s)
+PARTIDAS_COMPLETE_TTL = 1800
+
+# Máximo de rodadas buscadas em paralelo (o pool do banco deve ter pelo menos isso + 2)
+ROUND_FETCH_WORKERS = 5
+
+class _SWRCache:
+    """
+    Cache stale-while-revalidate de um único valor.
+    - idade < max_age: devolve o valor em cache
+    - idade < max_age + swr: devolve o valor antigo e atualiza em background
+    - caso contrário (ou sem valor): busca de forma bloqueante
+    """
+    def __init__(self):
+        self.value = None
+        self.fetched_at = 0.0
+        self.lock = threading.Lock()
+        self.refreshing = False
+    
+    def set(self, value):
+        """Grava um valor obtido por fora (ex.: busca fresca do ciclo) como recém-buscado."""
+        if value is not None:
+            with self.lock:
+                self.value = value
+                self.fetched_at = time.monotonic()
+    
+    def _refresh(self, fetcher):
+        try:
+            value = fetcher()
+            if value is not None:
+                with self.lock:
+                    self.value = value
+                    self.fetched_at = time.monotonic()
+            return value
+        finally:
+            with self.lock:
+                self.refreshing = False
+    
+    def get(self, fetcher, max_age: float = 300, swr: float = 3600):
+        with self.lock:
+            value = self.value
+            age = time.monotonic() - self.fetched_at
+            if value is not None and age < max_age:
+                return value
+            if value is not None and age < max_age + swr:
+                if not self.refreshing:
+                    self.refreshing = True
+                    threading.Thread(target=self._refresh, args=(fetcher,), daemon=True).start()
+                return value
+            self.refreshing = True
+        return self._refresh(fetcher)
+
+# Status do mercado para quem só precisa do número da rodada (muda no máximo 1x por semana).
+# Decisões sobre o estado do mercado (fechado/aberto) usam fetch_status_data() direto,
+# nunca este cache: um valor de até uma hora atrás perderia o fechamento do mercado
+_status_cache = _SWRCache()
+
 def retry_on_failure(max_retries: int = 3, delay: float = 1.0, backoff: float = 2.0):
     """Decorator para retry automático em caso de falha"""
     def decorator(func):
@@ -110,18 +167,58 @@ def retry_on_failure(max_retries: int = 3, delay: float = 1.0, backoff: float =
                     last_exception = e
                     if attempt < max_retries - 1:
                         logger.warning(
-                            f"Tentativa {attempt + 1}/{max_retries} falhou para {func.__name__}: {e}. "
-                            f"Tentando novamente em {current_delay:.2f}s..."
+                            "Tentativa %d/%d falhou para %s: %s. Tentando novamente em %.2fs...",
+                            attempt + 1, max_retries, func.__name__, e, current_delay
                         )
                         time.sleep(current_delay)
                         current_delay *= backoff
                     else:
-                        logger.error(f"Todas as tentativas falharam para {func.__name__}: {e}")
+                        logger.error("Todas as tentativas falharam para %s: %s", func.__name__, e)
             
             raise last_exception
         return wrapper
     return decorator
 
+# Consultas recorrentes do ciclo, preparadas uma vez por conexão (PREPARE/EXECUTE):
+# o parse/planejamento é feito só na primeira execução em cada sessão do Postgres
+_PREPARED_SQL = {}
+for _tabela in ('partidas', 'pontuados'):
+    _PREPARED_SQL[f'{_tabela}_rodada_existe'] = (
+        f"SELECT EXISTS (SELECT 1 FROM acf_{_tabela} WHERE rodada_id = $1 AND temporada = $2)"
+    )
+    _PREPARED_SQL[f'{_tabela}_rodadas_faltantes'] = f"""
+        SELECT g.rodada
+        FROM generate_series($1::int, $2::int) AS g(rodada)
+        WHERE NOT EXISTS (
+            SELECT 1 FROM acf_{_tabela} t
+            WHERE t.rodada_id = g.rodada AND t.temporada = $3
+        )
+        ORDER BY g.rodada DESC
+    """
+
+# Statements já preparados por conexão: {id(conn): (conn, {nomes})}. A entrada guarda a
+# própria conexão, então o id() não é reaproveitado enquanto ela existir; entradas de
+# conexões fechadas (reciclagem do pool) são descartadas a cada novo PREPARE
+_prepared = {}
+_prepared_lock = threading.Lock()
+
+def _execute_prepared(cursor, name: str, params: tuple):
+    """Executa a consulta `name` de _PREPARED_SQL, preparando-a antes se for a primeira vez na sessão"""
+    conn = cursor.connection
+    with _prepared_lock:
+        entry = _prepared.get(id(conn))
+        prepared = entry is not None and entry[0] is conn and name in entry[1]
+    if not prepared:
+        cursor.execute(f"PREPARE {name} AS {_PREPARED_SQL[name]}")
+        with _prepared_lock:
+            for key in [k for k, (c, _) in _prepared.items() if c.closed]:
+                del _prepared[key]
+            entry = _prepared.get(id(conn))
+            if entry is None or entry[0] is not conn:
+                entry = _prepared[id(conn)] = (conn, set())
+            entry[1].add(name)
+    cursor.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", params)
+
 class DataFetcherService:
     """Serviço principal para fetch de dados do Cartola FC"""
     
@@ -130,6 +227,20 @@ class DataFetcherService:
         self.running = False
         self.last_fetch_time = None
         self.last_fetch_status = None
+        # Último payload de /mercado/status obtido (preenchido por get_current_round)
+        self.last_status_data = None
+        # Tabelas que já se sabe ter dados (evita consultar o banco a cada ciclo)
+        self._has_data: dict[str, bool] = {}
+        # Verificações concluídas sem pendências: {(tabela, rodada_atual): instante monotônico}
+        self._marks: dict[tuple, float] = {}
+        # Intervalo configurado e o efetivamente agendado (muda com o mercado fechado)
+        self.interval_minutes = None
+        self._scheduled_interval = None
+        # Último payload do mercado gravado com sucesso (mesmo objeto = resposta 304/cache)
+        self._stored_mercado = None
+        # Conexão do ciclo em andamento e a thread que a usa
+        self._cycle_conn = None
+        self._cycle_thread = None
         # Inicializar banco de dados (criar tabelas se não existirem)
         logger.info("Inicializando banco de dados...")
         if initialize_database():
@@ -139,6 +250,52 @@ class DataFetcherService:
     
     # ========== FUNÇÕES AUXILIARES DE CONTROLE DE ATUALIZAÇÃO ==========
     
+    @contextmanager
+    def _db(self):
+        """
+        Conexão para os helpers: a do ciclo em andamento quando chamado da thread do ciclo,
+        senão (threads de rodadas paralelas, chamadas avulsas) uma emprestada do pool.
+        """
+        conn = self._cycle_conn
+        if conn is None or threading.get_ident() != self._cycle_thread:
+            with DB_POOL.acquire() as conn:
+                yield conn
+            return
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            if not conn.closed:
+                conn.rollback()
+            raise
+    
+    @contextmanager
+    def _cycle_connection(self):
+        """
+        Reserva uma conexão para todo o ciclo, reaproveitada pelos helpers via _db().
+        Os update_* continuam com commit por etapa (falha em uma etapa não desfaz as outras),
+        mas com synchronous_commit=off esses commits não esperam o fsync do WAL: o ciclo paga
+        a latência de disco uma vez, não por tabela. Os dados vêm da API e podem ser buscados
+        de novo, então perder os últimos commits num crash do servidor é aceitável.
+        """
+        with DB_POOL.acquire() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SET synchronous_commit TO OFF")
+            conn.commit()
+            self._cycle_conn = conn
+            self._cycle_thread = threading.get_ident()
+            try:
+                yield conn
+            finally:
+                self._cycle_conn = None
+                self._cycle_thread = None
+                if not conn.closed:
+                    # Fecha a transação pendente e devolve a conexão ao pool com o padrão
+                    conn.commit()
+                    with conn.cursor() as cursor:
+                        cursor.execute("RESET synchronous_commit")
+                    conn.commit()
+    
     def _get_table_name(self, table_name: str) -> str:
         """Retorna o nome da tabela com prefixo acf_ se necessário"""
         # Tabelas que precisam do prefixo acf_
@@ -150,87 +307,84 @@ class DataFetcherService:
     
     def _check_round_exists(self, table_name: str, rodada: int) -> bool:
         """Verifica se uma rodada específica existe no banco de dados"""
-        conn = get_db_connection()
-        if not conn:
-            return False
-        
         try:
-            cursor = conn.cursor()
-            actual_table_name = self._get_table_name(table_name)
-            
-            # Para pontuados, verificar também pela temporada atual
-            if table_name == 'pontuados':
-                from utils.utilidades import get_temporada_atual
-                temporada = get_temporada_atual()
-                cursor.execute(
-                    f"SELECT COUNT(*) FROM {actual_table_name} WHERE rodada_id = %s AND temporada = %s",
-                    (rodada, temporada)
-                )
-            else:
-                cursor.execute(
-                    f"SELECT COUNT(*) FROM {actual_table_name} WHERE rodada_id = %s",
-                    (rodada,)
-                )
+            with self._db() as conn:
+                cursor = conn.cursor()
+                actual_table_name = self._get_table_name(table_name)
             
-            count = cursor.fetchone()[0]
-            cursor.close()
-            return count > 0
+                # Para pontuados, verificar também pela temporada atual
+                if table_name == 'pontuados':
+                    temporada = get_temporada_atual()
+                    _execute_prepared(cursor, 'pontuados_rodada_existe', (rodada, temporada))
+                else:
+                    cursor.execute(
+                        f"SELECT EXISTS (SELECT 1 FROM {actual_table_name} WHERE rodada_id = %s)",
+                        (rodada,)
+                    )
             
+                exists = cursor.fetchone()[0]
+                cursor.close()
+                return exists
         except Exception as e:
-            logger.error(f"Erro ao verificar se rodada {rodada} existe em {table_name}: {e}")
+            logger.error("Erro ao verificar se rodada %s existe em %s: %s", rodada, table_name, e)
             return False
-        finally:
-            close_db_connection(conn)
     
     def table_has_data(self, table_name: str) -> bool:
-        """Verifica se uma tabela tem dados"""
-        conn = get_db_connection()
-        if not conn:
-            return False
+        """
+        Verifica se uma tabela tem dados.
+        Tabelas de referência não voltam a ficar vazias: o resultado positivo fica
+        em memória até o serviço reiniciar.
+        """
+        if self._has_data.get(table_name):
+            return True
         try:
-            cursor = conn.cursor()
-            actual_table_name = self._get_table_name(table_name)
-            cursor.execute(f'SELECT COUNT(*) FROM "{actual_table_name}"')
-            count = cursor.fetchone()[0]
-            cursor.close()
-            return count > 0
+            with self._db() as conn:
+                cursor = conn.cursor()
+                actual_table_name = self._get_table_name(table_name)
+                cursor.execute(f'SELECT EXISTS (SELECT 1 FROM "{actual_table_name}")')
+                has_data = cursor.fetchone()[0]
+                cursor.close()
+                if has_data:
+                    self._has_data[table_name] = True
+                return has_data
         except Exception as e:
-            logger.error(f"Erro ao verificar dados da tabela {table_name}: {e}")
+            logger.error("Erro ao verificar dados da tabela %s: %s", table_name, e)
             return False
-        finally:
-            close_db_connection(conn)
+    
+    def _mark(self, key: tuple):
+        """Registra que a verificação identificada por key terminou sem pendências"""
+        self._marks[key] = time.monotonic()
+    
+    def _recently_marked(self, key: tuple, ttl_seconds: float) -> bool:
+        """Indica se key foi registrada há menos de ttl_seconds"""
+        marked_at = self._marks.get(key)
+        return marked_at is not None and time.monotonic() - marked_at < ttl_seconds
     
     def get_rounds_without_scores(self, rodada_atual: int) -> list[int]:
         """
         Retorna lista de rodadas anteriores à atual que têm partidas sem placar preenchido.
         Apenas partidas válidas (valida = true) são consideradas.
         """
-        conn = get_db_connection()
-        if not conn:
-            return []
-        
         try:
-            cursor = conn.cursor()
-            
-            # Buscar rodadas anteriores à atual que têm partidas válidas sem placar
-            cursor.execute("""
-                SELECT DISTINCT rodada_id
-                FROM acf_partidas
-                WHERE rodada_id < %s
-                    AND valida = true
-                    AND (placar_oficial_mandante IS NULL OR placar_oficial_visitante IS NULL)
-                ORDER BY rodada_id DESC
-            """, (rodada_atual,))
-            
-            rounds = [row[0] for row in cursor.fetchall()]
-            cursor.close()
-            return rounds
+            with self._db() as conn:
+                cursor = conn.cursor()
+            
+                # Buscar rodadas anteriores à atual que têm partidas válidas sem placar
+                cursor.execute("""
+                    SELECT DISTINCT rodada_id
+                    FROM acf_partidas
+                    WHERE rodada_id < %s
+                        AND valida = true
+                        AND (placar_oficial_mandante IS NULL OR placar_oficial_visitante IS NULL)
+                    ORDER BY rodada_id DESC
+                """, (rodada_atual,))
             
+                rounds = [row[0] for row in cursor.fetchall()]
+                cursor.close()
+                return rounds
         except Exception as e:
-            logger.error(f"Erro ao verificar rodadas sem placar: {e}")
+            logger.error("Erro ao verificar rodadas sem placar: %s", e)
             return []
-        finally:
-            close_db_connection(conn)
     
     def get_missing_rounds(self, table_name: str, rodada_atual: int, max_rounds_to_check: int = None) -> list[int]:
         """
@@ -240,112 +394,131 @@ class DataFetcherService:
         Para pontuados: verifica todas as rodadas de 1 até rodada_atual - 1
         EXCEÇÃO: Se rodada_atual for 38 (última do campeonato), inclui também a rodada 38
         """
-        conn = get_db_connection()
-        if not conn:
-            return []
-        
         try:
-            cursor = conn.cursor()
-            
-            # Determinar range de rodadas a verificar
-            if table_name == 'pontuados':
-                # Pontuados: até rodada anterior (não inclui a atual, pois ainda não aconteceu)
-                # EXCEÇÃO: Se rodada atual for 38 (última do campeonato), incluir também
-                min_round = 1
-                if rodada_atual == 38:
-                    # Última rodada do campeonato, incluir também
-                    max_round = 38
-                else:
-                    max_round = rodada_atual - 1 if rodada_atual > 1 else 0
-            elif table_name == 'partidas':
-                # Partidas: inclui a rodada atual (para ter os dados dos jogos que vão acontecer)
-                min_round = 1
-                max_round = rodada_atual
-            else:
-                cursor.close()
-                return []
-            
-            if max_round < min_round:
-                cursor.close()
-                return []
-            
-            # Se especificado, limitar quantidade de rodadas a verificar
-            if max_rounds_to_check:
-                min_round = max(min_round, max_round - max_rounds_to_check + 1)
-            
-            # Buscar todas as rodadas que existem no banco
-            # Verificar também pela temporada atual para TODAS as tabelas com suporte a temporada
-            actual_table_name = self._get_table_name(table_name)
-            
-            from utils.utilidades import get_temporada_atual
-            temporada = get_temporada_atual()
+            with self._db() as conn:
+                cursor = conn.cursor()
             
-            # Tabelas que têm coluna temporada
-            tables_with_season = ['pontuados', 'partidas', 'atletas_historico', 'destaques_historico']
-            
-            if table_name in tables_with_season or table_name == 'partidas':
-                cursor.execute(f"SELECT DISTINCT rodada_id FROM {actual_table_name} WHERE rodada_id BETWEEN %s AND %s AND temporada = %s", (min_round, max_round, temporada))
-            else:
-                cursor.execute(f"SELECT DISTINCT rodada_id FROM {actual_table_name} WHERE rodada_id BETWEEN %s AND %s", (min_round, max_round))
-            existing_rounds = {row[0] for row in cursor.fetchall()}
+                # Determinar range de rodadas a verificar
+                if table_name == 'pontuados':
+                    # Pontuados: até rodada anterior (não inclui a atual, pois ainda não aconteceu)
+                    # EXCEÇÃO: Se rodada atual for 38 (última do campeonato), incluir também
+                    min_round = 1
+                    if rodada_atual == 38:
+                        # Última rodada do campeonato, incluir também
+                        max_round = 38
+                    else:
+                        max_round = rodada_atual - 1 if rodada_atual > 1 else 0
+                elif table_name == 'partidas':
+                    # Partidas: inclui a rodada atual (para ter os dados dos jogos que vão acontecer)
+                    min_round = 1
+                    max_round = rodada_atual
+                else:
+                    cursor.close()
+                    return []
             
-            # Encontrar rodadas faltantes
-            all_rounds = set(range(min_round, max_round + 1))
-            missing_rounds = sorted(list(all_rounds - existing_rounds), reverse=True)  # Ordena do maior para o menor
+                if max_round < min_round:
+                    cursor.close()
+                    return []
             
-            cursor.close()
-            return missing_rounds
+                # Se especificado, limitar quantidade de rodadas a verificar
+                if max_rounds_to_check:
+                    min_round = max(min_round, max_round - max_rounds_to_check + 1)
             
+                # Rodadas do intervalo sem registro na temporada atual, calculadas no próprio banco
+                # (só as faltantes trafegam, já ordenadas da maior para a menor).
+                # table_name já foi restrito a partidas/pontuados acima.
+                temporada = get_temporada_atual()
+                
+                _execute_prepared(cursor, f'{table_name}_rodadas_faltantes', (min_round, max_round, temporada))
+                missing_rounds = [row[0] for row in cursor.fetchall()]
+                
+                cursor.close()
+                return missing_rounds
         except Exception as e:
-            logger.error(f"Erro ao verificar rodadas faltantes para {table_name}: {e}")
+            logger.error("Erro ao verificar rodadas faltantes para %s: %s", table_name, e)
             return []
-        finally:
-            close_db_connection(conn)
     
     def was_updated_in_round(self, table_name: str, rodada: int) -> bool:
         """
         Verifica se uma tabela já foi atualizada na rodada atual.
-        Para partidas, verifica se já existe partida para essa rodada.
-        Para outras tabelas por rodada, verifica last_update (assume 1x por rodada dentro de 24h).
+        Para partidas e pontuados, verifica se já existem registros dessa rodada na temporada atual.
+        Não há tabela de controle de atualização (updates_tracking): demais tabelas retornam False.
         """
-        conn = get_db_connection()
-        if not conn:
-            return False
         try:
-            cursor = conn.cursor()
+            with self._db() as conn:
+                cursor = conn.cursor()
             
-            # Importar utilitário de temporada
-            from utils.utilidades import get_temporada_atual
-            temporada = get_temporada_atual()
+                temporada = get_temporada_atual()
             
-            # Para partidas, verificar se já existe partida para essa rodada NA TEMPORADA ATUAL
-            if table_name == 'partidas':
-                cursor.execute("SELECT COUNT(*) FROM acf_partidas WHERE rodada_id = %s AND temporada = %s", (rodada, temporada))
-                count = cursor.fetchone()[0]
-                cursor.close()
-                return count > 0
+                # Para partidas, verificar se já existe partida para essa rodada NA TEMPORADA ATUAL
+                if table_name == 'partidas':
+                    _execute_prepared(cursor, 'partidas_rodada_existe', (rodada, temporada))
+                    exists = cursor.fetchone()[0]
+                    cursor.close()
+                    return exists
             
-            # Para pontuados, verificar se já existe pontuados para essa rodada NA TEMPORADA ATUAL
-            if table_name == 'pontuados':
-                cursor.execute("SELECT COUNT(*) FROM acf_pontuados WHERE rodada_id = %s AND temporada = %s", (rodada, temporada))
-                count = cursor.fetchone()[0]
-                cursor.close()
-                return count > 0
+                # Para pontuados, verificar se já existe pontuados para essa rodada NA TEMPORADA ATUAL
+                if table_name == 'pontuados':
+                    _execute_prepared(cursor, 'pontuados_rodada_existe', (rodada, temporada))
+                    exists = cursor.fetchone()[0]
+                    cursor.close()
+                    return exists
             
-            # Destaques não são mais verificados aqui - são atualizados a cada 5 minutos
+                # Destaques não são mais verificados aqui - são atualizados a cada 5 minutos
             
-            cursor.close()
-            return False
+                cursor.close()
+                return False
         except Exception as e:
-            logger.error(f"Erro ao verificar atualização para {table_name}: {e}")
+            logger.error("Erro ao verificar atualização para %s: %s", table_name, e)
             return False
-        finally:
-            close_db_connection(conn)
     
-    def get_current_round(self) -> Optional[int]:
-        """Obtém a rodada atual do status da API"""
+    def _fetch_rounds_parallel(self, fetch_func, rodadas: list[int]) -> dict[int, bool]:
+        """Executa fetch_func(rodada) para cada rodada em paralelo e retorna {rodada: sucesso}"""
+        results = {}
+        if not rodadas:
+            return results
+        with ThreadPoolExecutor(max_workers=min(ROUND_FETCH_WORKERS, len(rodadas))) as executor:
+            futures = {executor.submit(fetch_func, rodada): rodada for rodada in rodadas}
+            for future in as_completed(futures):
+                rodada = futures[future]
+                try:
+                    results[rodada] = future.result()
+                except Exception as e:
+                    logger.error("Erro ao buscar rodada %s em %s: %s", rodada, fetch_func.__name__, e)
+                    results[rodada] = False
+        return results
+    
+    def _prefetch_cycle_data(self, rodada_atual: int):
+        """
+        Dispara em paralelo as requisições públicas do ciclo (mercado e partidas da rodada atual).
+        As respostas ficam no cache do api_cartola, então os fetch_and_store_* seguintes não
+        esperam a rede uma a uma: o tempo de rede do ciclo passa a ser o da requisição mais lenta.
+        """
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [
+                executor.submit(fetch_cartola_data),
+                executor.submit(fetch_partidas_data, rodada_atual),
+            ]
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.warning("Falha no prefetch do ciclo: %s", e)
+    
+    def get_current_round(self, fresh: bool = False) -> Optional[int]:
+        """
+        Obtém a rodada atual do status da API.
+        fresh=True busca o status sem o cache stale-while-revalidate e o guarda em
+        last_status_data (usado pelo ciclo para decidir se o mercado está fechado) e no
+        próprio cache, para que leituras seguintes nunca fiquem atrás do que o ciclo validou.
+        """
         try:
-            status_data = fetch_status_data()
+            if fresh:
+                status_data = fetch_status_data()
+                self.last_status_data = status_data
+                _status_cache.set(status_data)
+            else:
+                status_data = _status_cache.get(fetch_status_data)
             if status_data and 'rodada_atual' in status_data:
                 return status_data['rodada_atual']
             elif status_data and 'mercado' in status_data:
@@ -356,15 +529,18 @@ class DataFetcherService:
             logger.warning("Não foi possível determinar a rodada atual")
             return None
         except Exception as e:
-            logger.error(f"Erro ao obter rodada atual: {e}")
+            logger.error("Erro ao obter rodada atual: %s", e)
             return None
     
     @retry_on_failure(max_retries=3, delay=2.0)
     @rate_limiter
-    def fetch_and_store_cartola_data(self) -> bool:
+    def fetch_and_store_cartola_data(self, rodada_atual: Optional[int] = None) -> bool:
         """
         Busca e armazena dados principais do Cartola (mercado/atletas)
         
+        rodada_atual: rodada já validada pelo ciclo; sem ela o status é buscado na hora
+        (nunca do cache SWR: uma rodada atrasada gravaria o histórico na rodada anterior)
+        
         Lógica de atualização:
         - clubes, posicoes, status: Só atualiza se não tiverem dados
         - atletas: Sempre atualiza (a cada 5 minutos)
@@ -377,14 +553,14 @@ class DataFetcherService:
                 logger.error("Falha ao obter dados do mercado")
                 return False
             
-            conn = get_db_connection()
-            if not conn:
-                logger.error("Falha ao conectar ao banco de dados")
-                return False
+            if data is self._stored_mercado:
+                logger.info("Mercado sem alterações desde a última gravação (304/cache), pulando")
+                return True
             
-            try:
-                # Obter rodada atual
-                rodada_atual = self.get_current_round()
+            with self._db() as conn:
+                # Obter rodada atual (a do ciclo, ou uma busca fresca do status)
+                if not rodada_atual:
+                    rodada_atual = self.get_current_round(fresh=True)
                 if not rodada_atual:
                     logger.warning("Rodada atual não disponível, usando rodada padrão")
                     rodada_atual = data.get('rodada_atual', 1)
@@ -396,64 +572,70 @@ class DataFetcherService:
                     if not self.table_has_data('clubes'):
                         logger.info("Atualizando clubes (primeira vez)...")
                         update_clubes(conn, data['clubes'])
-                        logger.info(f"Clubes atualizados: {len(data['clubes'])}")
+                        self._has_data['clubes'] = True
+                        logger.info("Clubes atualizados: %s", len(data['clubes']))
                     else:
                         logger.info("Clubes já possui dados, pulando atualização")
                 
-                # Atualizar posições (só se não tiver dados)
-                if 'posicoes' in data:
-                    if not self.table_has_data('posicoes'):
-                        logger.info("Atualizando posições (primeira vez)...")
-                        update_posicoes(conn, data['posicoes'])
-                        logger.info(f"Posições atualizadas: {len(data['posicoes'])}")
-                    else:
-                        logger.info("Posições já possui dados, pulando atualização")
-                
-                # Atualizar status (só se não tiver dados)
-                if 'status' in data:
-                    if not self.table_has_data('status'):
-                        logger.info("Atualizando status (primeira vez)...")
-                        update_status(conn, data['status'])
-                        logger.info(f"Status atualizados: {len(data['status'])}")
-                    else:
-                        logger.info("Status já possui dados, pulando atualização")
+                # Posições e status numa transação só (um COMMIT, sem esperar o fsync do WAL)
+                atualizar_posicoes = 'posicoes' in data and not self.table_has_data('posicoes')
+                atualizar_status = 'status' in data and not self.table_has_data('status')
+                if atualizar_posicoes or atualizar_status:
+                    with fast_ingest_tx(conn):
+                        # Atualizar posições (só se não tiver dados)
+                        if atualizar_posicoes:
+                            logger.info("Atualizando posições (primeira vez)...")
+                            update_posicoes(conn, data['posicoes'], commit=False)
+                        # Atualizar status (só se não tiver dados)
+                        if atualizar_status:
+                            logger.info("Atualizando status (primeira vez)...")
+                            update_status(conn, data['status'], commit=False)
+                if atualizar_posicoes:
+                    self._has_data['posicoes'] = True
+                    logger.info("Posições atualizadas: %s", len(data['posicoes']))
+                elif 'posicoes' in data:
+                    logger.info("Posições já possui dados, pulando atualização")
+                if atualizar_status:
+                    self._has_data['status'] = True
+                    logger.info("Status atualizados: %s", len(data['status']))
+                elif 'status' in data:
+                    logger.info("Status já possui dados, pulando atualização")
                 
                 # ===== TABELAS QUE ATUALIZAM SEMPRE (A CADA 5 MIN) =====
                 
                 # Atualizar atletas sempre
                 if 'atletas' in data and data['atletas']:
                     logger.info("Processando atletas...")
-                    atletas_data = []
-                    for atleta in data['atletas']:
-                        atleta_data = {
-                            'atleta_id': atleta.get('atleta_id'),
-                            'clube_id': atleta.get('clube_id'),
-                            'posicao_id': atleta.get('posicao_id'),
-                            'status_id': atleta.get('status_id'),
-                            'pontos_num': atleta.get('pontos_num'),
-                            'media_num': atleta.get('media_num'),
-                            'variacao_num': atleta.get('variacao_num'),
-                            'preco_num': atleta.get('preco_num'),
-                            'jogos_num': atleta.get('jogos_num'),
-                            'entrou_em_campo': atleta.get('entrou_em_campo', False),
-                            'slug': atleta.get('slug'),
-                            'apelido': atleta.get('apelido'),
-                            'nome': atleta.get('nome'),
-                            'foto': atleta.get('foto')
-                        }
-                        atletas_data.append(atleta_data)
+                    # Tuplas na ordem de ATLETA_FIELDS (sem dict intermediário por atleta)
+                    atletas_data = [
+                        (
+                            atleta.get('atleta_id'),
+                            atleta.get('clube_id'),
+                            atleta.get('posicao_id'),
+                            atleta.get('status_id'),
+                            atleta.get('pontos_num'),
+                            atleta.get('media_num'),
+                            atleta.get('variacao_num'),
+                            atleta.get('preco_num'),
+                            atleta.get('jogos_num'),
+                            atleta.get('entrou_em_campo', False),
+                            atleta.get('slug'),
+                            atleta.get('apelido'),
+                            atleta.get('nome'),
+                            atleta.get('foto')
+                        )
+                        for atleta in data['atletas']
+                    ]
                     
                     update_atletas(conn, atletas_data, rodada_atual)
-                    logger.info(f"Atletas atualizados: {len(atletas_data)}")
+                    logger.info("Atletas atualizados: %s", len(atletas_data))
                 
+                self._stored_mercado = data
                 logger.info("Dados do mercado Cartola processados com sucesso")
                 return True
                 
-            finally:
-                close_db_connection(conn)
-                
         except Exception as e:
-            logger.error(f"Erro ao buscar/armazenar dados do Cartola: {e}", exc_info=True)
+            logger.error("Erro ao buscar/armazenar dados do Cartola: %s", e, exc_info=True)
             return False
     
     @retry_on_failure(max_retries=3, delay=2.0)
@@ -462,6 +644,7 @@ class DataFetcherService:
         """Busca e armazena status do mercado"""
         try:
             logger.info("Buscando status do mercado...")
+            # Estado do mercado: sem stale-while-revalidate (só o TTL curto de fetch_status_data)
             status_data = fetch_status_data()
             
             if not status_data:
@@ -471,12 +654,12 @@ class DataFetcherService:
             # Status geralmente não precisa ser armazenado separadamente
             # já que é atualizado junto com os dados do mercado
             # Mas podemos usar para verificar estado do mercado
-            self.last_fetch_status = status_data
+            self.last_status_data = status_data
             logger.info("Status do mercado obtido com sucesso")
             return True
             
         except Exception as e:
-            logger.error(f"Erro ao buscar status: {e}", exc_info=True)
+            logger.error("Erro ao buscar status: %s", e, exc_info=True)
             return False
     
     @retry_on_failure(max_retries=3, delay=2.0)
@@ -488,27 +671,20 @@ class DataFetcherService:
         O ON CONFLICT DO UPDATE garante que apenas dados alterados sejam atualizados
         """
         try:
-            logger.info(f"Buscando partidas da rodada {rodada}...")
+            logger.info("Buscando partidas da rodada %s...", rodada)
             partidas_data = fetch_partidas_data(rodada)
             
             if not partidas_data:
-                logger.warning(f"Nenhuma partida encontrada para rodada {rodada}")
-                return False
-            
-            conn = get_db_connection()
-            if not conn:
-                logger.error("Falha ao conectar ao banco de dados")
+                logger.warning("Nenhuma partida encontrada para rodada %s", rodada)
                 return False
             
-            try:
-                update_partidas(conn, partidas_data, rodada)
-                logger.info(f"Partidas da rodada {rodada} atualizadas com sucesso")
+            with self._db() as conn, fast_ingest_tx(conn):
+                update_partidas(conn, partidas_data, rodada, commit=False)
+                logger.info("Partidas da rodada %s atualizadas com sucesso", rodada)
                 return True
-            finally:
-                close_db_connection(conn)
                 
         except Exception as e:
-            logger.error(f"Erro ao buscar/armazenar partidas da rodada {rodada}: {e}", exc_info=True)
+            logger.error("Erro ao buscar/armazenar partidas da rodada %s: %s", rodada, e, exc_info=True)
             return False
     
     @retry_on_failure(max_retries=3, delay=2.0)
@@ -519,27 +695,20 @@ class DataFetcherService:
         Lógica: Atualiza uma vez por rodada (o modelo já verifica duplicação)
         """
         try:
-            logger.info(f"Buscando atletas pontuados da rodada {rodada}...")
+            logger.info("Buscando atletas pontuados da rodada %s...", rodada)
             pontuados_data = fetch_pontuados_data(rodada)
             
             if not pontuados_data:
-                logger.warning(f"Nenhum atleta pontuado encontrado para rodada {rodada}")
-                return False
-            
-            conn = get_db_connection()
-            if not conn:
-                logger.error("Falha ao conectar ao banco de dados")
+                logger.warning("Nenhum atleta pontuado encontrado para rodada %s", rodada)
                 return False
             
-            try:
-                update_pontuados(conn, pontuados_data, rodada)
-                logger.info(f"Atletas pontuados da rodada {rodada} armazenados com sucesso")
+            with self._db() as conn, fast_ingest_tx(conn):
+                update_pontuados(conn, pontuados_data, rodada, commit=False)
+                logger.info("Atletas pontuados da rodada %s armazenados com sucesso", rodada)
                 return True
-            finally:
-                close_db_connection(conn)
                 
         except Exception as e:
-            logger.error(f"Erro ao buscar/armazenar pontuados da rodada {rodada}: {e}", exc_info=True)
+            logger.error("Erro ao buscar/armazenar pontuados da rodada %s: %s", rodada, e, exc_info=True)
             return False
     
     @retry_on_failure(max_retries=2, delay=3.0)
@@ -562,24 +731,18 @@ class DataFetcherService:
                 logger.warning("Nenhum esquema encontrado")
                 return False
             
-            conn = get_db_connection()
-            if not conn:
-                logger.error("Falha ao conectar ao banco de dados")
-                return False
-            
-            try:
+            with self._db() as conn:
                 # Verificar se já tem dados antes de atualizar
                 if not self.table_has_data('esquemas'):
                     update_esquemas(conn, esquemas_data)
-                    logger.info(f"Esquemas atualizados: {len(esquemas_data)}")
+                    self._has_data['esquemas'] = True
+                    logger.info("Esquemas atualizados: %s", len(esquemas_data))
                 else:
                     logger.info("Esquemas já possui dados, pulando atualização")
                 return True
-            finally:
-                close_db_connection(conn)
                 
         except Exception as e:
-            logger.error(f"Erro ao buscar/armazenar esquemas: {e}", exc_info=True)
+            logger.error("Erro ao buscar/armazenar esquemas: %s", e, exc_info=True)
             return False
     
     @retry_on_failure(max_retries=2, delay=3.0)
@@ -599,37 +762,48 @@ class DataFetcherService:
             
             # Log adicional para debug
             if isinstance(destaques_data, list):
-                logger.info(f"Dados de destaques recebidos: {len(destaques_data)} itens")
+                logger.info("Dados de destaques recebidos: %s itens", len(destaques_data))
                 if len(destaques_data) > 0:
-                    logger.debug(f"Estrutura do primeiro item: {type(destaques_data[0])}")
+                    logger.debug("Estrutura do primeiro item: %s", type(destaques_data[0]))
             else:
-                logger.warning(f"Formato inesperado de destaques_data: {type(destaques_data)}")
-            
-            conn = get_db_connection()
-            if not conn:
-                logger.error("Falha ao conectar ao banco de dados")
-                return False
+                logger.warning("Formato inesperado de destaques_data: %s", type(destaques_data))
             
-            try:
+            with self._db() as conn:
                 update_destaques(conn, destaques_data, rodada)
-                logger.info(f"Destaques atualizados: {len(destaques_data) if isinstance(destaques_data, list) else 'N/A'} itens")
+                logger.info("Destaques atualizados: %s itens", len(destaques_data) if isinstance(destaques_data, list) else 'N/A')
                 return True
-            finally:
-                close_db_connection(conn)
                 
         except Exception as e:
-            logger.error(f"Erro ao buscar/armazenar destaques: {e}", exc_info=True)
+            logger.error("Erro ao buscar/armazenar destaques: %s", e, exc_info=True)
             return False
     
+    def _reschedule(self, minutes: Optional[int]):
+        """Ajusta o intervalo do job de fetch (mais espaçado com o mercado fechado)"""
+        if not minutes or minutes == self._scheduled_interval:
+            return
+        self._scheduled_interval = minutes
+        if self.scheduler and self.scheduler.get_job('fetch_cycle'):
+            self.scheduler.reschedule_job('fetch_cycle', trigger=IntervalTrigger(minutes=minutes))
+            logger.info("Intervalo do ciclo de fetch ajustado para %s minutos", minutes)
+    
     def run_fetch_cycle(self):
-        """Executa um ciclo completo de fetch de dados"""
+        """Executa um ciclo completo de fetch de dados usando uma única conexão do pool"""
+        try:
+            with self._cycle_connection():
+                self._run_cycle()
+        except Exception as e:
+            logger.error("Erro crítico no ciclo de fetch: %s", e, exc_info=True)
+            self.last_fetch_status = 'error'
+    
+    def _run_cycle(self):
+        """Etapas do ciclo de fetch (chamado por run_fetch_cycle)"""
         start_time = time.time()
         brasilia_datetime = get_brasilia_datetime()
         print(f"\n{'='*60}")
         print(f"Iniciando ciclo de fetch - {brasilia_datetime} (Horario de Brasilia)")
         print(f"{'='*60}\n")
         logger.info("=" * 60)
-        logger.info(f"Iniciando ciclo de fetch - {brasilia_datetime} (Horário de Brasília)")
+        logger.info("Iniciando ciclo de fetch - %s (Horário de Brasília)", brasilia_datetime)
         logger.info("=" * 60)
         
         results = {
@@ -641,19 +815,21 @@ class DataFetcherService:
         
         try:
             # 0. Validar rodada atual PRIMEIRO (antes de qualquer processamento)
-            rodada_atual = self.get_current_round()
+            # (status atual, não o do cache SWR: é ele que decide se o mercado fechou)
+            rodada_atual = self.get_current_round(fresh=True)
             if not rodada_atual or rodada_atual < 1:
                 logger.error("Não foi possível obter rodada atual válida. Abortando ciclo.")
                 self.last_fetch_status = 'error'
                 return
             
-            logger.info(f"Rodada atual validada: {rodada_atual}")
+            logger.info("Rodada atual validada: %s", rodada_atual)
             
             # 0.1 Verificar status do mercado ANTES de atualizar qualquer tabela
-            status_data = fetch_status_data()
+            # (reaproveita o payload recém-obtido por get_current_round(fresh=True) acima)
+            status_data = self.last_status_data
             if status_data:
                 status_mercado = status_data.get('status_mercado')
-                logger.info(f"Status do mercado: {status_mercado}")
+                logger.info("Status do mercado: %s", status_mercado)
                 
                 if status_mercado == 2:
                     logger.info("⚠️  MERCADO FECHADO (status_mercado=2) - Jogos acontecendo, pulando atualização das tabelas")
@@ -663,52 +839,56 @@ class DataFetcherService:
                     print("Os jogos estão acontecendo. As tabelas serão atualizadas após o mercado abrir.")
                     print(f"{'='*60}\n")
                     self.last_fetch_status = 'skipped_market_closed'
+                    self._reschedule(CLOSED_MARKET_INTERVAL_MINUTES)
                     return
                 else:
-                    logger.info(f"✓ Mercado em estado adequado para atualização (status={status_mercado})")
+                    self._reschedule(self.interval_minutes)
+                    logger.info("✓ Mercado em estado adequado para atualização (status=%s)", status_mercado)
             else:
                 logger.warning("Não foi possível obter status do mercado. Continuando com atualização por segurança.")
             
             # 1. Status já foi verificado acima, marcar como sucesso
             results['status'] = True
             
+            # 1.1 Buscar em paralelo os dados públicos usados pelas etapas abaixo
+            self._prefetch_cycle_data(rodada_atual)
+            
             # 2. Buscar dados principais do Cartola (atletas, clubes, etc.)
-            results['cartola_data'] = self.fetch_and_store_cartola_data()
+            results['cartola_data'] = self.fetch_and_store_cartola_data(rodada_atual)
             
             # 3. Buscar esquemas (só se não tiver dados)
             self.fetch_and_store_esquemas()
             
             # 4. Buscar partidas, destaques e pontuados
             if rodada_atual:
-                logger.info(f"Rodada atual detectada: {rodada_atual}")
+                logger.info("Rodada atual detectada: %s", rodada_atual)
                 
                 # PARTIDAS: Atualizar rodada atual sempre (placares mudam durante os jogos)
                 # E rodadas anteriores que têm partidas sem placar
                 logger.info("Atualizando partidas da rodada atual e verificando rodadas anteriores sem placar...")
                 
                 # Sempre atualizar rodada atual (placares podem mudar)
-                logger.info(f"Atualizando partidas da rodada atual ({rodada_atual})...")
+                logger.info("Atualizando partidas da rodada atual (%s)...", rodada_atual)
                 self.fetch_and_store_partidas_per_round(rodada_atual)
                 
                 # Verificar rodadas anteriores que têm partidas sem placar
                 if rodada_atual > 1:
                     rounds_sem_placar = self.get_rounds_without_scores(rodada_atual)
                     if rounds_sem_placar:
-                        logger.info(f"Rodadas anteriores com partidas sem placar encontradas: {rounds_sem_placar}")
-                        for rodada_sem_placar in rounds_sem_placar:
-                            logger.info(f"Atualizando partidas da rodada {rodada_sem_placar} para buscar placares...")
-                            self.fetch_and_store_partidas_per_round(rodada_sem_placar)
+                        logger.info("Rodadas anteriores com partidas sem placar encontradas: %s", rounds_sem_placar)
+                        self._fetch_rounds_parallel(self.fetch_and_store_partidas_per_round, rounds_sem_placar)
                     else:
                         logger.info("Todas as rodadas anteriores têm placares preenchidos")
                 
                 # Verificar se há rodadas muito antigas faltando (sem partidas cadastradas)
-                if rodada_atual > 1:
+                # (pulado se a verificação já encontrou tudo cadastrado há menos de 30 min nesta rodada)
+                if rodada_atual > 1 and not self._recently_marked(('partidas', rodada_atual), PARTIDAS_COMPLETE_TTL):
                     missing_partidas = self.get_missing_rounds('partidas', rodada_atual - 1)
                     if missing_partidas:
-                        logger.info(f"Rodadas de partidas anteriores faltantes (sem cadastro): {missing_partidas}")
-                        for rodada_missing in missing_partidas:
-                            logger.info(f"Buscando partidas da rodada {rodada_missing}...")
-                            self.fetch_and_store_partidas_per_round(rodada_missing)
+                        logger.info("Rodadas de partidas anteriores faltantes (sem cadastro): %s", missing_partidas)
+                        self._fetch_rounds_parallel(self.fetch_and_store_partidas_per_round, missing_partidas)
+                    else:
+                        self._mark(('partidas', rodada_atual))
                 
                 results['partidas'] = True
                 
@@ -730,14 +910,12 @@ class DataFetcherService:
                             missing_pontuados.append(38)
                     
                     if missing_pontuados:
-                        logger.info(f"Rodadas de pontuados faltantes encontradas: {missing_pontuados}")
-                        for rodada_missing in missing_pontuados:
-                            logger.info(f"Buscando pontuados da rodada {rodada_missing}...")
-                            self.fetch_and_store_pontuados(rodada_missing)
+                        logger.info("Rodadas de pontuados faltantes encontradas: %s", missing_pontuados)
+                        self._fetch_rounds_parallel(self.fetch_and_store_pontuados, missing_pontuados)
                         results['pontuados'] = True
                     else:
                         max_round_msg = 38 if rodada_atual == 38 else rodada_atual - 1
-                        logger.info(f"Todos os pontuados das rodadas (1 até {max_round_msg}) já estão atualizados")
+                        logger.info("Todos os pontuados das rodadas (1 até %s) já estão atualizados", max_round_msg)
                         results['pontuados'] = True
                 else:
                     # Mesmo se rodada atual for 1, verificar se rodada 38 existe (pode ter sido finalizado o campeonato)
@@ -763,19 +941,19 @@ class DataFetcherService:
             print(f"{'='*60}\n")
             logger.info("=" * 60)
             logger.info("Resumo do ciclo de fetch:")
-            logger.info(f"  Início: {brasilia_datetime}")
-            logger.info(f"  Fim: {brasilia_finish}")
+            logger.info("  Início: %s", brasilia_datetime)
+            logger.info("  Fim: %s", brasilia_finish)
             for task, success in results.items():
                 status = "[OK]" if success else "[ERRO]"
-                logger.info(f"  {status} {task}: {'Sucesso' if success else 'Falhou'}")
-            logger.info(f"  Tempo total: {elapsed_time:.2f}s")
+                logger.info("  %s %s: %s", status, task, 'Sucesso' if success else 'Falhou')
+            logger.info("  Tempo total: %.2fs", elapsed_time)
             logger.info("=" * 60)
             
             self.last_fetch_time = datetime.now(BRASILIA_TZ)
             self.last_fetch_status = 'success' if all(results.values()) else 'partial'
             
         except Exception as e:
-            logger.error(f"Erro crítico no ciclo de fetch: {e}", exc_info=True)
+            logger.error("Erro crítico no ciclo de fetch: %s", e, exc_info=True)
             self.last_fetch_status = 'error'
     
     def start(self, interval_minutes: int = 5):
@@ -784,19 +962,29 @@ class DataFetcherService:
             logger.warning("Serviço já está em execução")
             return
         
-        logger.info(f"Iniciando Data Fetcher Service (intervalo: {interval_minutes} minutos)")
+        logger.info("Iniciando Data Fetcher Service (intervalo: %s minutos)", interval_minutes)
+        
+        # Abrir o pool de conexões antes do primeiro ciclo
+        DB_POOL.open()
+        self.interval_minutes = interval_minutes
         
-        # Executar primeiro ciclo imediatamente
+        # Executar primeiro ciclo imediatamente (pode ajustar o intervalo se o mercado estiver fechado)
         self.run_fetch_cycle()
         
         # Configurar agendamento
+        self._scheduled_interval = self._scheduled_interval or interval_minutes
         self.scheduler = BackgroundScheduler()
         self.scheduler.add_job(
             self.run_fetch_cycle,
-            trigger=IntervalTrigger(minutes=interval_minutes),
+            trigger=IntervalTrigger(minutes=self._scheduled_interval),
             id='fetch_cycle',
             name='Ciclo de Fetch de Dados',
-            replace_existing=True
+            replace_existing=True,
+            # Nunca dois ciclos simultâneos (dividiriam pool e rate limiter); execuções
+            # atrasadas são agrupadas em uma só
+            max_instances=1,
+            coalesce=True,
+            misfire_grace_time=interval_minutes * 60
         )
         
         self.scheduler.start()
@@ -814,6 +1002,8 @@ class DataFetcherService:
         if self.scheduler:
             self.scheduler.shutdown(wait=True)
         
+        DB_POOL.close()
+        
         self.running = False
         logger.info("[OK] Data Fetcher Service parado")
     
@@ -833,12 +1023,13 @@ fetcher_service = DataFetcherService()
 def main():
     """Função principal para executar o serviço"""
     import signal
-    import sys
+    
+    # Acordado apenas pelo sinal de parada (sem polling enquanto o serviço roda)
+    stop_event = threading.Event()
     
     def signal_handler(sig, frame):
         logger.info("Recebido sinal de interrupção. Parando serviço...")
-        fetcher_service.stop()
-        sys.exit(0)
+        stop_event.set()
     
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
@@ -851,13 +1042,12 @@ def main():
         
         # Manter o processo vivo
         logger.info("Serviço em execução. Pressione Ctrl+C para parar.")
-        while True:
-            time.sleep(1)
+        stop_event.wait()
             
     except KeyboardInterrupt:
         logger.info("Interrompido pelo usuário")
     except Exception as e:
-        logger.error(f"Erro fatal: {e}", exc_info=True)
+        logger.error("Erro fatal: %s", e, exc_info=True)
     finally:
         fetcher_service.stop()
 
@@ -1,11 +1,25 @@
 import psycopg2
+from psycopg2 import pool as pg_pool
 from psycopg2.extras import RealDictCursor
 import os
+import atexit
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
 from dotenv import load_dotenv
 
+_ENV_LOADED = False
+
+def load_env():
+    """Carrega o .env (encoding utf-8) uma única vez por processo."""
+    global _ENV_LOADED
+    if not _ENV_LOADED:
+        load_dotenv(encoding='utf-8')
+        _ENV_LOADED = True
+
 # Carrega variáveis de ambiente do .env com encoding utf-8
-load_dotenv(encoding='utf-8')
+load_env()
 
 # Configurações do PostgreSQL via variáveis de ambiente (obrigatórias)
 POSTGRES_CONFIG = {
@@ -31,53 +45,174 @@ if missing_vars:
 # Garantir que o nome do banco seja sempre cartola_manager
 POSTGRES_CONFIG['database'] = 'cartola_manager'
 
+# Argumentos de conexão já filtrados (sem valores None), calculados uma vez no import
+_PG_KWARGS = {k: v for k, v in POSTGRES_CONFIG.items() if v is not None}
+
+class ConnectionPool:
+    """
+    Pool de conexões PostgreSQL thread-safe, criado sob demanda no primeiro uso.
+    Reaproveita conexões já autenticadas em vez de refazer TCP + TLS + auth a cada consulta.
+    """
+
+    def __init__(self, minconn: int = 1, maxconn: int = 10, max_lifetime: float = 3600):
+        self.minconn = minconn
+        self.maxconn = maxconn
+        # Conexões mais velhas que isso são fechadas ao voltar para o pool (0 desativa);
+        # evita sockets longevos derrubados por proxy/failover e memória acumulada no backend
+        self.max_lifetime = max_lifetime
+        self._born = {}
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = pg_pool.ThreadedConnectionPool(self.minconn, self.maxconn, **_PG_KWARGS)
+        return self._pool
+
+    def open(self):
+        """Cria o pool (e as conexões mínimas) antecipadamente."""
+        self._get_pool()
+
+    @contextmanager
+    def acquire(self):
+        """Empresta uma conexão: commit ao sair normalmente, rollback em caso de exceção."""
+        conn = self.getconn()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            if not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            self.putconn(conn)
+
+    def getconn(self):
+        """Empresta uma conexão sem context manager; devolver com putconn()."""
+        conn = self._get_pool().getconn()
+        self._born.setdefault(id(conn), time.monotonic())
+        return conn
+
+    def _expired(self, conn) -> bool:
+        born = self._born.get(id(conn))
+        return bool(self.max_lifetime) and born is not None and time.monotonic() - born > self.max_lifetime
+
+    def putconn(self, conn):
+        """Devolve ao pool (transação pendente é desfeita pelo pool); fecha se não pertencer a ele ou se expirou."""
+        pool = self._pool
+        if pool is None:
+            self._born.pop(id(conn), None)
+            conn.close()
+            return
+        close = bool(conn.closed) or self._expired(conn)
+        try:
+            pool.putconn(conn, close=close)
+            # Além das expiradas, o próprio pool fecha a conexão devolvida quando já tem
+            # minconn ociosas; a idade sai junto, senão um id() reutilizado a herdaria
+            if conn.closed:
+                self._born.pop(id(conn), None)
+        except pg_pool.PoolError:
+            # Conexão de um pool já fechado/recriado
+            self._born.pop(id(conn), None)
+            conn.close()
+
+    def close(self):
+        """Fecha todas as conexões do pool (um novo pool é criado no próximo acquire)."""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.closeall()
+                self._pool = None
+                self._born.clear()
+
+# Pool compartilhado pelos módulos do serviço
+DB_POOL = ConnectionPool(
+    minconn=int(os.getenv('PG_POOL_MIN', 2)),
+    maxconn=int(os.getenv('PG_POOL_MAX', 10)),
+    max_lifetime=float(os.getenv('PG_POOL_MAX_LIFETIME', 3600))
+)
+atexit.register(DB_POOL.close)
+
 def get_db_connection():
-    """Conecta ao banco de dados PostgreSQL"""
+    """Obtém uma conexão do pool PostgreSQL (devolver com close_db_connection)"""
     try:
-        # Garantir que valores None não sejam passados
-        config = {k: v for k, v in POSTGRES_CONFIG.items() if v is not None}
-        conn = psycopg2.connect(**config)
+        conn = DB_POOL.getconn()
         conn.autocommit = False
         return conn
-    except (psycopg2.Error, UnicodeDecodeError, ValueError) as e:
+    except (psycopg2.Error, pg_pool.PoolError, UnicodeDecodeError, ValueError) as e:
         print(f"Erro ao conectar ao PostgreSQL: {e}")
         return None
 
 def close_db_connection(conn):
-    """Fecha a conexão com o banco de dados"""
+    """Devolve a conexão ao pool (não fecha o socket)"""
     if conn:
         try:
-            conn.close()
+            DB_POOL.putconn(conn)
         except psycopg2.Error as e:
-            print(f"Erro ao fechar conexão: {e}")
+            print(f"Erro ao devolver conexão ao pool: {e}")
+
+@contextmanager
+def db_cursor(readonly=False, cursor_factory=RealDictCursor):
+    """
+    Cursor sobre uma conexão do pool, uma transação por bloco `with`.
+    - readonly=False: commit ao sair, rollback em caso de exceção
+    - readonly=True: sessão read-only em autocommit (leituras não pagam COMMIT)
+    """
+    conn = DB_POOL.getconn()
+    cursor = None
+    try:
+        if readonly:
+            conn.set_session(readonly=True, autocommit=True)
+        cursor = conn.cursor(cursor_factory=cursor_factory)
+        yield cursor
+        if not readonly:
+            conn.commit()
+    except Exception:
+        if not conn.closed and not conn.autocommit:
+            conn.rollback()
+        raise
+    finally:
+        if cursor is not None and not cursor.closed:
+            cursor.close()
+        if readonly and not conn.closed:
+            # Devolve a conexão ao pool com o padrão de sessão ('DEFAULT' volta ao padrão
+            # do servidor; None deixaria a conexão read-only para o próximo que a pegar)
+            conn.set_session(readonly='DEFAULT', autocommit=False)
+        DB_POOL.putconn(conn)
+
+@contextmanager
+def fast_ingest_tx(conn):
+    """
+    Agrupa vários updates de ingestão numa única transação da conexão `conn`:
+    um COMMIT só no final, sem esperar o fsync do WAL (SET LOCAL synchronous_commit = off;
+    os dados vêm da API do Cartola e podem ser buscados de novo após um crash).
+    Rollback em caso de exceção. Os updates dentro do bloco devem usar commit=False.
+    """
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SET LOCAL synchronous_commit = off")
+        yield conn
+        conn.commit()
+    except Exception:
+        if not conn.closed:
+            conn.rollback()
+        raise
 
 def execute_query(query, params=None, fetch_one=False, fetch_all=False):
     """Executa uma query e retorna o resultado"""
-    conn = get_db_connection()
-    if not conn:
-        return None
-    
     try:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        cursor.execute(query, params)
-        
-        if fetch_one:
-            result = cursor.fetchone()
-        elif fetch_all:
-            result = cursor.fetchall()
-        else:
-            result = cursor.rowcount
-        
-        conn.commit()
-        cursor.close()
-        return result
-        
+        with db_cursor() as cursor:
+            cursor.execute(query, params)
+            
+            if fetch_one:
+                return cursor.fetchone()
+            elif fetch_all:
+                return cursor.fetchall()
+            return cursor.rowcount
     except psycopg2.Error as e:
-        conn.rollback()
         print(f"Erro na query: {e}")
         return None
-    finally:
-        close_db_connection(conn)
 
 def create_database_if_not_exists():
     """Cria o banco de dados cartola_manager se ele não existir"""
@@ -122,8 +257,15 @@ def create_database_if_not_exists():
         print(f"[ERRO] Erro ao criar banco de dados: {e}")
         return False
 
+# init.sql já aplicado neste processo (o DDL é idempotente, mas custa conexões e parse)
+_SCHEMA_INITIALIZED = False
+
 def initialize_database():
-    """Inicializa o banco de dados executando o arquivo init.sql"""
+    """Inicializa o banco de dados executando o arquivo init.sql (uma vez por processo)"""
+    global _SCHEMA_INITIALIZED
+    if _SCHEMA_INITIALIZED:
+        return True
+    
     # Primeiro, criar o banco se não existir
     if not create_database_if_not_exists():
         print("[ERRO] Falha ao criar/verificar banco de dados")
@@ -145,30 +287,16 @@ def initialize_database():
         with open(init_sql_path, 'r', encoding='utf-8') as f:
             sql_content = f.read()
         
-        # Dividir o SQL em instruções individuais e executar uma por uma
-        cursor = conn.cursor()
-        # Dividir por ponto-e-vírgula e filtrar instruções vazias
-        statements = [s.strip() for s in sql_content.split(';') if s.strip()]
-        
-        for statement in statements:
-            # Remover comentários de linha (-- até o fim da linha)
-            lines = []
-            for line in statement.split('\n'):
-                if '--' in line:
-                    # Manter apenas a parte antes do comentário
-                    comment_pos = line.find('--')
-                    if comment_pos >= 0:
-                        line = line[:comment_pos].rstrip()
-                if line.strip():
-                    lines.append(line)
-            
-            cleaned_statement = '\n'.join(lines).strip()
-            if cleaned_statement:  # Pular strings vazias após limpeza
-                cursor.execute(cleaned_statement)
-        
-        conn.commit()
-        cursor.close()
+        # Envia o arquivo inteiro em uma única chamada: o parser do Postgres trata
+        # comentários, strings e dollar-quoting corretamente (uma ida e volta ao servidor).
+        # `with conn` faz do arquivo uma transação só: commit ao final, rollback em erro.
+        # O COMMIT do bootstrap não espera o fsync do WAL (num crash basta rodar o init de novo);
+        # SET LOCAL vale só para esta transação, a conexão volta ao pool com o padrão.
+        with conn, conn.cursor() as cursor:
+            cursor.execute("SET LOCAL synchronous_commit = off")
+            cursor.execute(sql_content)
         
+        _SCHEMA_INITIALIZED = True
         print("[OK] Banco de dados inicializado com sucesso!")
         
         # Verificar e inserir credencial padrão do .env se necessário
@@ -184,7 +312,6 @@ def initialize_database():
         return True
         
     except psycopg2.Error as e:
-        conn.rollback()
         print(f"[ERRO] Erro ao inicializar banco de dados: {e}")
         return False
     except Exception as e:
@@ -194,12 +321,14 @@ def initialize_database():
         close_db_connection(conn)
 
 def test_connection():
-    """Testa a conexão com o banco"""
-    conn = get_db_connection()
-    if conn:
-        print("[OK] Conexao com PostgreSQL estabelecida com sucesso!")
-        close_db_connection(conn)
+    """
+    Testa a conexão com o banco: `SELECT 1` numa conexão do pool (uma ida e volta
+    num socket já autenticado). Sem prints; quem chama reporta o resultado.
+    """
+    try:
+        with db_cursor(readonly=True, cursor_factory=None) as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
         return True
-    else:
-        print("[ERRO] Falha na conexao com PostgreSQL")
-        return False
\ No newline at end of file
+    except Exception:
+        return False
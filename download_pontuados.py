@@ -6,17 +6,35 @@ para análise em planilhas.
 
 import os
 import csv
-import json
-import time
+import io
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from operator import itemgetter
 from pathlib import Path
-from api_cartola import fetch_pontuados_data
-from database import get_db_connection, close_db_connection
+from api_cartola import fetch_pontuados_data, SESSION_POOL_MAXSIZE
+from database import db_cursor
 
 # Criar diretórios se não existirem
 BASE_DIR = Path(__file__).parent
 DATA_DIR = BASE_DIR / 'data' / 'pontuados_baixados'
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 
+# Rodadas baixadas simultaneamente; limitado ao pool da SESSION para que toda thread
+# reaproveite um socket keep-alive (acima disso o urllib3 abre e descarta conexões)
+DL_WORKERS = min(int(os.getenv('DL_WORKERS', 8)), SESSION_POOL_MAXSIZE)
+
+# Scouts exportados (apenas siglas), na ordem das colunas do CSV
+SCOUT_KEYS = ('G', 'A', 'FD', 'FF', 'DE', 'DS', 'FS', 'FC', 'CA', 'CV',
+              'GS', 'SG', 'I', 'DP', 'FT', 'PC', 'PP', 'PS', 'V')
+_ZEROS = (0,) * len(SCOUT_KEYS)  # atleta sem scout
+
+FIELDNAMES = (
+    'rodada', 'atleta_id', 'apelido', 'clube_id', 'clube',
+    'posicao_id', 'posicao', 'pontuacao', 'entrou_em_campo', 'foto',
+    *SCOUT_KEYS
+)
+IDX_APELIDO = FIELDNAMES.index('apelido')
+IDX_PONTUACAO = FIELDNAMES.index('pontuacao')
+
 # Cache global de clubes e posições
 CLUBES_CACHE = {}
 POSICOES_CACHE = {}
@@ -25,42 +43,98 @@ def load_clubes_and_posicoes():
     """Carrega todos os clubes e posições uma vez no início"""
     global CLUBES_CACHE, POSICOES_CACHE
     
-    conn = get_db_connection()
-    if not conn:
-        print("⚠️  Erro ao conectar ao banco para carregar clubes e posições")
-        return
-    
     try:
-        # Carregar clubes
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, nome, abreviacao FROM acf_clubes")
-        for row in cursor.fetchall():
-            clube_id, nome, abreviacao = row
-            CLUBES_CACHE[clube_id] = nome or abreviacao or f"Clube_{clube_id}"
+        # Uma conexão, nenhum COMMIT e uma única ida ao banco para as duas tabelas:
+        # o fallback nome -> abreviação -> rótulo sai pronto do SQL e cada linha vem
+        # marcada com a tabela de origem
+        with db_cursor(readonly=True, cursor_factory=None) as cursor:
+            cursor.execute("""
+                SELECT 'c', id, COALESCE(NULLIF(nome, ''), NULLIF(abreviacao, ''), 'Clube_' || id::text)
+                FROM acf_clubes
+                UNION ALL
+                SELECT 'p', id, COALESCE(NULLIF(nome, ''), NULLIF(abreviacao, ''), 'Pos_' || id::text)
+                FROM acf_posicoes
+            """)
+            caches = {'c': {}, 'p': {}}
+            for tabela, id_, nome in cursor:
+                caches[tabela][id_] = nome
+            CLUBES_CACHE, POSICOES_CACHE = caches['c'], caches['p']
         
-        # Carregar posições
-        cursor.execute("SELECT id, nome, abreviacao FROM acf_posicoes")
-        for row in cursor.fetchall():
-            posicao_id, nome, abreviacao = row
-            POSICOES_CACHE[posicao_id] = nome or abreviacao or f"Pos_{posicao_id}"
-        
-        cursor.close()
         print(f"✅ Cache carregado: {len(CLUBES_CACHE)} clubes, {len(POSICOES_CACHE)} posições")
     except Exception as e:
-        print(f"⚠️  Erro ao carregar cache: {e}")
-    finally:
-        close_db_connection(conn)
+        print(f"⚠️  Erro ao carregar cache de clubes e posições: {e}")
 
 def get_clube_name(clube_id):
     """Retorna o nome do clube do cache"""
-    return CLUBES_CACHE.get(clube_id, f"Clube_{clube_id}")
+    nome = CLUBES_CACHE.get(clube_id)
+    return nome if nome is not None else f"Clube_{clube_id}"
 
 def get_posicao_name(posicao_id):
     """Retorna o nome da posição do cache"""
-    return POSICOES_CACHE.get(posicao_id, f"Pos_{posicao_id}")
+    nome = POSICOES_CACHE.get(posicao_id)
+    return nome if nome is not None else f"Pos_{posicao_id}"
+
+# Colunas do CSV montadas no próprio SQL, na ordem de FIELDNAMES; scouts que a tabela não
+# guarda (DP, FT, PC, PP, PS, V) saem vazios (NULL), não 0, para não parecerem dados reais.
+# O COPY formata o CSV no servidor e o arquivo é escrito em streaming.
+_SCOUT_COLUMNS = {'G': 'scout_g', 'A': 'scout_a', 'FD': 'scout_fd', 'FF': 'scout_ff',
+                  'DE': 'scout_de', 'DS': 'scout_ds', 'FS': 'scout_fs', 'FC': 'scout_fc',
+                  'CA': 'scout_ca', 'CV': 'scout_cv', 'GS': 'scout_gs', 'SG': 'scout_sg',
+                  'I': 'scout_i'}
+_COPY_PONTUADOS_SQL = """
+    COPY (
+        SELECT p.rodada_id AS rodada, p.atleta_id, COALESCE(p.apelido, '') AS apelido,
+               p.clube_id, COALESCE(NULLIF(c.nome, ''), NULLIF(c.abreviacao, ''), 'Clube_' || p.clube_id::text) AS clube,
+               p.posicao_id, COALESCE(NULLIF(pos.nome, ''), NULLIF(pos.abreviacao, ''), 'Pos_' || p.posicao_id::text) AS posicao,
+               COALESCE(p.pontuacao, 0) AS pontuacao,
+               CASE WHEN p.entrou_em_campo THEN 'Sim' ELSE 'Não' END AS entrou_em_campo,
+               COALESCE(p.foto, '') AS foto,
+               {scouts}
+        FROM acf_pontuados p
+        LEFT JOIN acf_clubes c ON c.id = p.clube_id
+        LEFT JOIN acf_posicoes pos ON pos.id = p.posicao_id
+        WHERE p.rodada_id = %s
+        ORDER BY p.pontuacao DESC NULLS LAST
+    ) TO STDOUT WITH (FORMAT csv, HEADER true)
+""".format(scouts=', '.join(
+    f'COALESCE(p.{_SCOUT_COLUMNS[k]}, 0) AS "{k}"' if k in _SCOUT_COLUMNS else f'NULL AS "{k}"'
+    for k in SCOUT_KEYS
+))
+
+# Retorno de download_pontuados_rodada quando a rodada veio do banco e não da API
+ORIGEM_BANCO = 'banco'
+
+def export_pontuados_rodada_db(rodada):
+    """
+    Exporta para CSV os pontuados de uma rodada já salvos em acf_pontuados (via COPY).
+    O arquivo leva o sufixo _banco para não ser confundido com um CSV completo da API.
+    Retorna ORIGEM_BANCO em caso de sucesso, False se a rodada não estiver no banco.
+    """
+    filename = DATA_DIR / f'pontuados_rodada_{rodada:02d}_banco.csv'
+    
+    with db_cursor(readonly=True, cursor_factory=None) as cursor:
+        # copy_expert não aceita parâmetros: o valor é escapado pelo próprio driver
+        sql = cursor.mogrify(_COPY_PONTUADOS_SQL, (int(rodada),)).decode()
+        with open(filename, 'wb') as csvfile:
+            # BOM para manter o mesmo encoding (utf-8-sig) dos CSVs gerados a partir da API
+            csvfile.write(b'\xef\xbb\xbf')
+            header_end = csvfile.tell() + len(','.join(FIELDNAMES)) + 1
+            cursor.copy_expert(sql, csvfile)
+            has_rows = csvfile.tell() > header_end
+    
+    if not has_rows:
+        filename.unlink(missing_ok=True)
+        print(f"⚠️  Nenhum atleta no banco para rodada {rodada}")
+        return False
+    
+    print(f"🗄️  Rodada {rodada}: atletas exportados do banco em {filename.name} (scouts DP/FT/PC/PP/PS/V vazios)")
+    return ORIGEM_BANCO
 
 def download_pontuados_rodada(rodada):
-    """Baixa dados de pontuados de uma rodada e salva em CSV"""
+    """
+    Baixa dados de pontuados de uma rodada e salva em CSV.
+    Retorna True (API), ORIGEM_BANCO (API sem dados, exportado do banco) ou False.
+    """
     print(f"\n{'='*60}")
     print(f"Baixando pontuados da rodada {rodada}...")
     print(f"{'='*60}")
@@ -69,83 +143,66 @@ def download_pontuados_rodada(rodada):
     pontuados_data = fetch_pontuados_data(rodada)
     
     if not pontuados_data:
-        print(f"⚠️  Nenhum dado encontrado para rodada {rodada}")
-        return False
+        # Sem resposta da API: usa o que já está salvo no banco
+        print(f"⚠️  Nenhum dado da API para rodada {rodada}; exportando do banco...")
+        return export_pontuados_rodada_db(rodada)
     
     if 'atletas' not in pontuados_data:
         print(f"⚠️  Formato de dados inválido para rodada {rodada}")
         return False
     
-    # Preparar dados para CSV
+    # Preparar dados para CSV: uma tupla por atleta, na ordem de FIELDNAMES
     rows = []
+    append = rows.append
+    clubes_get = CLUBES_CACHE.get
+    posicoes_get = POSICOES_CACHE.get
     atletas = pontuados_data.get('atletas', {})
     
     for atleta_id, atleta in atletas.items():
-        scout = atleta.get('scout', {}) or {}
+        atleta_get = atleta.get
+        scout = atleta_get('scout')
+        # map com dois iteráveis chama scout.get(k, 0) em C, sem generator por atleta
+        scout_vals = tuple(map(scout.get, SCOUT_KEYS, _ZEROS)) if scout else _ZEROS
         
         # Buscar nomes de clube e posição
-        clube_id = atleta.get('clube_id', 0)
-        posicao_id = atleta.get('posicao_id', 0)
-        clube_nome = get_clube_name(clube_id)
-        posicao_nome = get_posicao_name(posicao_id)
+        clube_id = atleta_get('clube_id', 0)
+        posicao_id = atleta_get('posicao_id', 0)
         
-        row = {
-            'rodada': rodada,
-            'atleta_id': atleta_id,
-            'apelido': atleta.get('apelido', ''),
-            'clube_id': clube_id,
-            'clube': clube_nome,
-            'posicao_id': posicao_id,
-            'posicao': posicao_nome,
-            'pontuacao': atleta.get('pontuacao', 0.0),
-            'entrou_em_campo': 'Sim' if atleta.get('entrou_em_campo', False) else 'Não',
-            'foto': atleta.get('foto', ''),
-            # Scouts - apenas siglas
-            'G': scout.get('G', 0),
-            'A': scout.get('A', 0),
-            'FD': scout.get('FD', 0),
-            'FF': scout.get('FF', 0),
-            'DE': scout.get('DE', 0),
-            'DS': scout.get('DS', 0),
-            'FS': scout.get('FS', 0),
-            'FC': scout.get('FC', 0),
-            'CA': scout.get('CA', 0),
-            'CV': scout.get('CV', 0),
-            'GS': scout.get('GS', 0),
-            'SG': scout.get('SG', 0),
-            'I': scout.get('I', 0),
-            'DP': scout.get('DP', 0),
-            'FT': scout.get('FT', 0),
-            'PC': scout.get('PC', 0),
-            'PP': scout.get('PP', 0),
-            'PS': scout.get('PS', 0),
-            'V': scout.get('V', 0),
-        }
-        rows.append(row)
+        append((
+            rodada,
+            atleta_id,
+            atleta_get('apelido', ''),
+            clube_id,
+            clubes_get(clube_id) or f"Clube_{clube_id}",
+            posicao_id,
+            posicoes_get(posicao_id) or f"Pos_{posicao_id}",
+            atleta_get('pontuacao', 0.0),
+            'Sim' if atleta_get('entrou_em_campo', False) else 'Não',
+            atleta_get('foto', ''),
+            *scout_vals,
+        ))
     
     if not rows:
         print(f"⚠️  Nenhum atleta encontrado para rodada {rodada}")
         return False
     
     # Ordenar por pontuação (maior primeiro)
-    rows.sort(key=lambda x: x['pontuacao'], reverse=True)
+    rows.sort(key=itemgetter(IDX_PONTUACAO), reverse=True)
     
     # Salvar em CSV
     filename = DATA_DIR / f'pontuados_rodada_{rodada:02d}.csv'
-    fieldnames = [
-        'rodada', 'atleta_id', 'apelido', 'clube_id', 'clube', 
-        'posicao_id', 'posicao', 'pontuacao', 'entrou_em_campo', 'foto',
-        'G', 'A', 'FD', 'FF', 'DE', 'DS', 'FS', 'FC', 'CA', 'CV', 
-        'GS', 'SG', 'I', 'DP', 'FT', 'PC', 'PP', 'PS', 'V'
-    ]
     
+    # CSV montado em memória e gravado com um único write no arquivo
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(FIELDNAMES)
+    writer.writerows(rows)
     with open(filename, 'w', newline='', encoding='utf-8-sig') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows)
+        csvfile.write(buf.getvalue())
     
+    melhor = rows[0]
     print(f"✅ Rodada {rodada}: {len(rows)} atletas salvos em {filename.name}")
-    print(f"   Melhor pontuação: {rows[0]['pontuacao']:.2f} ({rows[0]['apelido']})")
+    print(f"   Melhor pontuação: {melhor[IDX_PONTUACAO]:.2f} ({melhor[IDX_APELIDO]})")
     
     return True
 
@@ -163,18 +220,13 @@ def main():
     print()
     
     # Verificar rodadas disponíveis no banco
-    conn = get_db_connection()
     rodadas_disponiveis = []
-    if conn:
-        try:
-            cursor = conn.cursor()
+    try:
+        with db_cursor(readonly=True, cursor_factory=None) as cursor:
             cursor.execute("SELECT DISTINCT rodada_id FROM acf_pontuados ORDER BY rodada_id")
             rodadas_disponiveis = [row[0] for row in cursor.fetchall()]
-            cursor.close()
-        except Exception as e:
-            print(f"⚠️  Erro ao buscar rodadas do banco: {e}")
-        finally:
-            close_db_connection(conn)
+    except Exception as e:
+        print(f"⚠️  Erro ao buscar rodadas do banco: {e}")
     
     if not rodadas_disponiveis:
         print("⚠️  Nenhuma rodada encontrada no banco. Tentando rodadas 1 a 37...")
@@ -186,24 +238,32 @@ def main():
     print(f"\n🔄 Iniciando download de {len(rodadas_disponiveis)} rodadas...\n")
     
     sucesso = 0
+    do_banco = 0
     falhas = 0
     
-    for rodada in rodadas_disponiveis:
-        try:
-            if download_pontuados_rodada(rodada):
-                sucesso += 1
-            else:
+    # Rodadas baixadas em paralelo; a SESSION do api_cartola já limita a taxa de requisições
+    # (CARTOLA_MAX_RPS), então não há mais sleep fixo entre rodadas
+    with ThreadPoolExecutor(max_workers=DL_WORKERS) as executor:
+        futures = {executor.submit(download_pontuados_rodada, rodada): rodada for rodada in rodadas_disponiveis}
+        for future in as_completed(futures):
+            rodada = futures[future]
+            try:
+                resultado = future.result()
+                if resultado == ORIGEM_BANCO:
+                    do_banco += 1
+                elif resultado:
+                    sucesso += 1
+                else:
+                    falhas += 1
+            except Exception as e:
+                print(f"❌ Erro ao processar rodada {rodada}: {e}")
                 falhas += 1
-            # Pequeno delay para não sobrecarregar a API
-            time.sleep(0.5)
-        except Exception as e:
-            print(f"❌ Erro ao processar rodada {rodada}: {e}")
-            falhas += 1
     
     print(f"\n{'='*60}")
     print("RESUMO DO DOWNLOAD")
     print(f"{'='*60}")
     print(f"✅ Sucesso: {sucesso} rodadas")
+    print(f"🗄️  Exportadas do banco (sem dados da API, arquivos *_banco.csv): {do_banco} rodadas")
     print(f"❌ Falhas: {falhas} rodadas")
     print(f"📁 Arquivos salvos em: {DATA_DIR}")
     print(f"{'='*60}\n")
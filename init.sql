@@ -31,9 +31,14 @@ CREATE TABLE IF NOT EXISTS acf_credenciais (
     refresh_token TEXT,
     id_token TEXT,
     estrategia INTEGER DEFAULT 1,
-    essential_cookies TEXT
+    essential_cookies TEXT,
+    access_token_exp BIGINT,  -- claim 'exp' do access token (epoch), evita decodificar o JWT a cada start
+    last_escala_hash TEXT  -- hash da última escalação aceita (evita reenviar payload idêntico)
 );
 
+ALTER TABLE acf_credenciais ADD COLUMN IF NOT EXISTS access_token_exp BIGINT;
+ALTER TABLE acf_credenciais ADD COLUMN IF NOT EXISTS last_escala_hash TEXT;
+
 CREATE TABLE IF NOT EXISTS acf_esquemas (
     esquema_id INTEGER PRIMARY KEY,
     nome TEXT,
@@ -85,6 +90,8 @@ CREATE TABLE IF NOT EXISTS acf_partidas (
     FOREIGN KEY (clube_visitante_id) REFERENCES acf_clubes(id)
 );
 
+CREATE INDEX IF NOT EXISTS idx_partidas_rodada_temporada ON acf_partidas(rodada_id, temporada);
+
 CREATE TABLE IF NOT EXISTS acf_pontuados (
     atleta_id INTEGER,
     rodada_id INTEGER,
@@ -113,6 +120,8 @@ CREATE TABLE IF NOT EXISTS acf_pontuados (
     FOREIGN KEY (posicao_id) REFERENCES acf_posicoes(id)
 );
 
+CREATE INDEX IF NOT EXISTS idx_pontuados_rodada_temporada ON acf_pontuados(rodada_id, temporada);
+
 CREATE TABLE IF NOT EXISTS acf_destaques (
     atleta_id INTEGER PRIMARY KEY,
     posicao TEXT,
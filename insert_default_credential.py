@@ -10,12 +10,11 @@ ou, como fallback, do arquivo refresh_token.json.
 import json
 import os
 from pathlib import Path
-from dotenv import load_dotenv
-from database import get_db_connection, close_db_connection
-from models.credenciais import insert_credencial, get_credencial_by_env_key
+from database import get_db_connection, close_db_connection, load_env
+from models.credenciais import insert_credencial_if_absent
 
 # Carregar variáveis de ambiente do .env
-load_dotenv(encoding='utf-8')
+load_env()
 
 def get_tokens_from_env():
     """Obtém tokens das variáveis de ambiente (.env)"""
@@ -68,15 +67,9 @@ def main():
         return False
     
     try:
-        # Verificar se a credencial já existe
-        existing_credential = get_credencial_by_env_key(conn, 'AERO_RBSV')
-        
-        if existing_credential:
-            print("[INFO] Credencial 'Aero-RBSV' ja existe no banco de dados (ID: {})".format(existing_credential['id']))
-            return True
-        
-        # Inserir credencial com estratégia 1 (só se não existir)
-        insert_credencial(
+        # Insere só se ainda não existir: uma ida ao banco e sem corrida entre SELECT e INSERT
+        # quando dois processos sobem ao mesmo tempo
+        credencial_id = insert_credencial_if_absent(
             conn=conn,
             nome='Aero-RBSV',
             env_key='AERO_RBSV',
@@ -86,7 +79,11 @@ def main():
             estrategia=1
         )
         
-        print("[OK] Credencial 'Aero-RBSV' inserida com sucesso!")
+        if credencial_id is None:
+            print("[INFO] Credencial 'Aero-RBSV' ja existe no banco de dados")
+            return True
+        
+        print("[OK] Credencial 'Aero-RBSV' inserida com sucesso! (ID: {})".format(credencial_id))
         print("   - env_key: AERO_RBSV")
         print("   - estrategia: 1")
         return True
@@ -1,83 +1,83 @@
+import logging
+import time
+from utils.utilidades import get_temporada_atual, copy_text_buffer, COPY_BUFFER_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Ordem dos campos de cada tupla recebida em update_atletas (mesma chave do JSON da API)
+ATLETA_FIELDS = (
+    'atleta_id', 'clube_id', 'posicao_id', 'status_id', 'pontos_num', 'media_num',
+    'variacao_num', 'preco_num', 'jogos_num', 'entrou_em_campo', 'slug', 'apelido',
+    'nome', 'foto'
+)
+# Colunas gravadas: os campos recebidos seguidos de rodada_id e temporada
+_ATLETA_COLUMNS = ', '.join(ATLETA_FIELDS + ('rodada_id', 'temporada'))
+
+def _upsert_from_stage_sql(table, conflict, update_cols, skip_unchanged=False):
+    """
+    Monta (uma vez, no import) o INSERT ... SELECT da tabela temporária para `table`.
+    skip_unchanged: não reescreve linhas idênticas (sem WAL nem versão morta).
+    """
+    sets = ',\n            '.join(f'{c} = EXCLUDED.{c}' for c in update_cols)
+    sql = f'''
+        INSERT INTO {table} ({_ATLETA_COLUMNS})
+        SELECT {_ATLETA_COLUMNS} FROM tmp_atletas
+        ON CONFLICT ({conflict}) DO UPDATE SET
+            {sets}'''
+    if skip_unchanged:
+        atual = ', '.join(f'{table}.{c}' for c in update_cols)
+        novo = ', '.join(f'EXCLUDED.{c}' for c in update_cols)
+        sql += f'''
+        WHERE ({atual})
+            IS DISTINCT FROM ({novo})'''
+    return sql
+
+_CAMPOS_MUTAVEIS = ATLETA_FIELDS[1:]
+# Tabela atual: uma linha por atleta (rodada_id é só referência)
+_UPSERT_ATUAL_SQL = _upsert_from_stage_sql(
+    'acf_atletas', 'atleta_id', ('rodada_id',) + _CAMPOS_MUTAVEIS + ('temporada',), skip_unchanged=True
+)
+# Histórico: uma linha por atleta e rodada, mesmas colunas e ordem da tabela atual
+_UPSERT_HISTORICO_SQL = _upsert_from_stage_sql(
+    'acf_atletas_historico', 'atleta_id, rodada_id', _CAMPOS_MUTAVEIS + ('temporada',), skip_unchanged=True
+)
+
 def update_atletas(conn, atletas_data, rodada_atual):
-    import time
-    from psycopg2.extras import execute_values
-    from utils.utilidades import get_temporada_atual
+    """
+    Sincroniza acf_atletas (e o histórico) com o mercado atual.
+    atletas_data: lista de tuplas na ordem de ATLETA_FIELDS.
+    """
     cursor = conn.cursor()
     t0 = time.time()
     temporada = get_temporada_atual()
     
-    # Sincroniza: remove atletas que não existem mais na API e upserta os atuais
-    ids_novos = [a['atleta_id'] for a in atletas_data] if atletas_data else []
+    # Sincronização + upserts numa transação só; a tabela é um snapshot regenerável a partir
+    # da API, então o COMMIT não precisa esperar o fsync do WAL (SET LOCAL vale até o commit)
+    cursor.execute('SET LOCAL synchronous_commit = off')
 
-    if not ids_novos:
-        cursor.execute('DELETE FROM acf_atletas WHERE temporada = %s', (temporada,))
-    else:
-        # Delete eficiente usando ANY(array)
-        cursor.execute("DELETE FROM acf_atletas WHERE temporada = %s AND NOT (atleta_id = ANY(%s))", (temporada, ids_novos))
+    # Um COPY para a tabela temporária (sem WAL, descartada no commit) alimenta o upsert
+    # da tabela atual, a sincronização e o histórico. As tuplas recebidas vão direto para o
+    # COPY: rodada_id e temporada são iguais para todas as linhas e entram como DEFAULT da
+    # temporária, sem montar uma tupla nova nem serializar duas colunas por atleta
+    rows = atletas_data or []
+    cursor.execute('''
+        CREATE TEMP TABLE tmp_atletas (LIKE acf_atletas INCLUDING DEFAULTS) ON COMMIT DROP;
+        ALTER TABLE tmp_atletas ALTER COLUMN rodada_id SET DEFAULT %s, ALTER COLUMN temporada SET DEFAULT %s;
+    ''', (rodada_atual, temporada))
+    cursor.copy_expert(f"COPY tmp_atletas ({', '.join(ATLETA_FIELDS)}) FROM STDIN", copy_text_buffer(rows), size=COPY_BUFFER_SIZE)
 
-    # Upsert em lote com execute_values (muito mais rápido)
-    rows = [(
-        a['atleta_id'], rodada_atual, a['clube_id'], a['posicao_id'], a['status_id'], a['pontos_num'],
-        a['media_num'], a['variacao_num'], a['preco_num'], a['jogos_num'], a['entrou_em_campo'],
-        a['slug'], a['apelido'], a['nome'], a['foto'], temporada
-    ) for a in atletas_data]
+    # Sincroniza: remove atletas da temporada que não existem mais na API
+    cursor.execute('''
+        DELETE FROM acf_atletas a
+        WHERE a.temporada = %s
+          AND NOT EXISTS (SELECT 1 FROM tmp_atletas t WHERE t.atleta_id = a.atleta_id)
+    ''', (temporada,))
 
-    insert_sql = '''
-        INSERT INTO acf_atletas (atleta_id, rodada_id, clube_id, posicao_id, status_id, pontos_num,
-                             media_num, variacao_num, preco_num, jogos_num, entrou_em_campo,
-                             slug, apelido, nome, foto, temporada)
-        VALUES %s
-        ON CONFLICT (atleta_id) DO UPDATE SET
-            rodada_id = EXCLUDED.rodada_id,
-            clube_id = EXCLUDED.clube_id,
-            posicao_id = EXCLUDED.posicao_id,
-            status_id = EXCLUDED.status_id,
-            pontos_num = EXCLUDED.pontos_num,
-            media_num = EXCLUDED.media_num,
-            variacao_num = EXCLUDED.variacao_num,
-            preco_num = EXCLUDED.preco_num,
-            jogos_num = EXCLUDED.jogos_num,
-            entrou_em_campo = EXCLUDED.entrou_em_campo,
-            slug = EXCLUDED.slug,
-            apelido = EXCLUDED.apelido,
-            nome = EXCLUDED.nome,
-            foto = EXCLUDED.foto,
-            temporada = EXCLUDED.temporada
-    '''
-    execute_values(cursor, insert_sql, rows, page_size=1000)
-    
-    # Também salvar no histórico (não sobrescreve, apenas adiciona)
-    historico_rows = [(
-        a['atleta_id'], rodada_atual, a['clube_id'], a['posicao_id'], a['status_id'], a['pontos_num'],
-        a['media_num'], a['variacao_num'], a['preco_num'], a['jogos_num'], a['entrou_em_campo'],
-        a['slug'], a['apelido'], a['nome'], a['foto'], temporada
-    ) for a in atletas_data]
+    cursor.execute(_UPSERT_ATUAL_SQL)
     
-    historico_sql = '''
-        INSERT INTO acf_atletas_historico (
-            atleta_id, rodada_id, clube_id, posicao_id, status_id, pontos_num,
-            media_num, variacao_num, preco_num, jogos_num, entrou_em_campo,
-            slug, apelido, nome, foto, temporada
-        )
-        VALUES %s
-        ON CONFLICT (atleta_id, rodada_id) DO UPDATE SET
-            clube_id = EXCLUDED.clube_id,
-            posicao_id = EXCLUDED.posicao_id,
-            status_id = EXCLUDED.status_id,
-            pontos_num = EXCLUDED.pontos_num,
-            media_num = EXCLUDED.media_num,
-            variacao_num = EXCLUDED.variacao_num,
-            preco_num = EXCLUDED.preco_num,
-            jogos_num = EXCLUDED.jogos_num,
-            entrou_em_campo = EXCLUDED.entrou_em_campo,
-            slug = EXCLUDED.slug,
-            apelido = EXCLUDED.apelido,
-            nome = EXCLUDED.nome,
-            foto = EXCLUDED.foto,
-            temporada = EXCLUDED.temporada
-    '''
-    execute_values(cursor, historico_sql, historico_rows, page_size=1000)
+    # Também salvar no histórico (não sobrescreve, apenas adiciona), da mesma temporária
+    cursor.execute(_UPSERT_HISTORICO_SQL)
     
     conn.commit()
-    t1 = time.time()
-    print(f"Atletas: upsert {len(rows)} registros em {t1 - t0:.2f}s (tabela atual + histórico), temporada {temporada}")
\ No newline at end of file
+    logger.info("Atletas: upsert %d registros em %.2fs (tabela atual + histórico), temporada %s",
+                len(rows), time.time() - t0, temporada)
\ No newline at end of file
@@ -1,15 +1,24 @@
+from psycopg2.extras import execute_values
+from utils.utilidades import EV_PAGE_SIZE
+
 def update_clubes(conn, clubes_data):
     cursor = conn.cursor()
-    for clube_id, clube in clubes_data.items():
-        cursor.execute('''
-            INSERT INTO acf_clubes (id, nome, abreviacao, slug, apelido, nome_fantasia, url_editoria)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (id) DO UPDATE SET
-                nome = EXCLUDED.nome,
-                abreviacao = EXCLUDED.abreviacao,
-                slug = EXCLUDED.slug,
-                apelido = EXCLUDED.apelido,
-                nome_fantasia = EXCLUDED.nome_fantasia,
-                url_editoria = EXCLUDED.url_editoria
-        ''', (int(clube_id), clube['nome'], clube['abreviacao'], clube['slug'], clube['apelido'], clube['nome_fantasia'], clube['url_editoria']))
+    rows = [
+        (int(clube_id), clube['nome'], clube['abreviacao'], clube['slug'], clube['apelido'], clube['nome_fantasia'], clube['url_editoria'])
+        for clube_id, clube in clubes_data.items()
+    ]
+    # Upsert em lote: uma ida ao banco em vez de um INSERT por clube
+    execute_values(cursor, '''
+        INSERT INTO acf_clubes (id, nome, abreviacao, slug, apelido, nome_fantasia, url_editoria)
+        VALUES %s
+        ON CONFLICT (id) DO UPDATE SET
+            nome = EXCLUDED.nome,
+            abreviacao = EXCLUDED.abreviacao,
+            slug = EXCLUDED.slug,
+            apelido = EXCLUDED.apelido,
+            nome_fantasia = EXCLUDED.nome_fantasia,
+            url_editoria = EXCLUDED.url_editoria
+        WHERE (acf_clubes.nome, acf_clubes.abreviacao, acf_clubes.slug, acf_clubes.apelido, acf_clubes.nome_fantasia, acf_clubes.url_editoria)
+            IS DISTINCT FROM (EXCLUDED.nome, EXCLUDED.abreviacao, EXCLUDED.slug, EXCLUDED.apelido, EXCLUDED.nome_fantasia, EXCLUDED.url_editoria)
+    ''', rows, page_size=EV_PAGE_SIZE)
     conn.commit()
\ No newline at end of file
@@ -1,5 +1,5 @@
 import psycopg2
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 def insert_credencial(conn: psycopg2.extensions.connection, nome: str, env_key: str, access_token: str = None, refresh_token: str = None, id_token: str = None, estrategia: int = 1, essential_cookies: str = None):
     cursor = conn.cursor()
@@ -12,11 +12,25 @@ def insert_credencial(conn: psycopg2.extensions.connection, nome: str, env_key:
             refresh_token = EXCLUDED.refresh_token,
             id_token = EXCLUDED.id_token,
             estrategia = EXCLUDED.estrategia,
-            essential_cookies = EXCLUDED.essential_cookies
+            essential_cookies = EXCLUDED.essential_cookies,
+            access_token_exp = NULL
     ''', (nome, env_key, access_token, refresh_token, id_token, estrategia, essential_cookies))
     conn.commit()
 
-def update_tokens_by_env_key(conn: psycopg2.extensions.connection, env_key: str, access_token: str = None, refresh_token: str = None, id_token: str = None):
+def insert_credencial_if_absent(conn: psycopg2.extensions.connection, nome: str, env_key: str, access_token: str = None, refresh_token: str = None, id_token: str = None, estrategia: int = 1) -> Optional[int]:
+    """Insere a credencial só se o env_key ainda não existir (uma ida ao banco). Retorna o id criado ou None."""
+    cursor = conn.cursor()
+    cursor.execute('''
+        INSERT INTO acf_credenciais (nome, env_key, access_token, refresh_token, id_token, estrategia)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        ON CONFLICT (env_key) DO NOTHING
+        RETURNING id
+    ''', (nome, env_key, access_token, refresh_token, id_token, estrategia))
+    row = cursor.fetchone()
+    conn.commit()
+    return row[0] if row else None
+
+def update_tokens_by_env_key(conn: psycopg2.extensions.connection, env_key: str, access_token: str = None, refresh_token: str = None, id_token: str = None, access_token_exp: int = None):
     cursor = conn.cursor()
     # Build dynamic set
     sets = []
@@ -24,6 +38,9 @@ def update_tokens_by_env_key(conn: psycopg2.extensions.connection, env_key: str,
     if access_token is not None:
         sets.append('access_token = %s')
         params.append(access_token)
+        # exp acompanha o access token (NULL quando não foi possível decodificar)
+        sets.append('access_token_exp = %s')
+        params.append(access_token_exp)
     if refresh_token is not None:
         sets.append('refresh_token = %s')
         params.append(refresh_token)
@@ -37,9 +54,15 @@ def update_tokens_by_env_key(conn: psycopg2.extensions.connection, env_key: str,
     cursor.execute(query, params)
     conn.commit()
 
+def update_last_escala_hash(conn: psycopg2.extensions.connection, env_key: str, escala_hash: str):
+    """Registra o hash da última escalação aceita pela API para a conta."""
+    cursor = conn.cursor()
+    cursor.execute('UPDATE acf_credenciais SET last_escala_hash = %s WHERE env_key = %s', (escala_hash, env_key))
+    conn.commit()
+
 def get_all_credenciais(conn: psycopg2.extensions.connection) -> List[Dict]:
     cursor = conn.cursor()
-    cursor.execute('SELECT id, nome, env_key, access_token, refresh_token, id_token, estrategia, essential_cookies FROM acf_credenciais')
+    cursor.execute('SELECT id, nome, env_key, access_token, refresh_token, id_token, estrategia, essential_cookies, access_token_exp, last_escala_hash FROM acf_credenciais')
     rows = cursor.fetchall()
     result = []
     for r in rows:
@@ -51,14 +74,16 @@ def get_all_credenciais(conn: psycopg2.extensions.connection) -> List[Dict]:
             'refresh_token': r[4], 
             'id_token': r[5], 
             'estrategia': r[6],
-            'essential_cookies': r[7]
+            'essential_cookies': r[7],
+            'access_token_exp': r[8],
+            'last_escala_hash': r[9]
         })
     return result
 
 def get_credencial_by_env_key(conn: psycopg2.extensions.connection, env_key: str) -> Dict:
     """Retorna uma única credencial pelo env_key ou None se não existir."""
     cursor = conn.cursor()
-    cursor.execute('SELECT id, nome, env_key, access_token, refresh_token, id_token, estrategia, essential_cookies FROM acf_credenciais WHERE env_key = %s LIMIT 1', (env_key,))
+    cursor.execute('SELECT id, nome, env_key, access_token, refresh_token, id_token, estrategia, essential_cookies, access_token_exp, last_escala_hash FROM acf_credenciais WHERE env_key = %s LIMIT 1', (env_key,))
     r = cursor.fetchone()
     if not r:
         return None
@@ -70,5 +95,7 @@ def get_credencial_by_env_key(conn: psycopg2.extensions.connection, env_key: str
         'refresh_token': r[4], 
         'id_token': r[5], 
         'estrategia': r[6],
-        'essential_cookies': r[7]
+        'essential_cookies': r[7],
+        'access_token_exp': r[8],
+        'last_escala_hash': r[9]
     }
@@ -1,60 +1,62 @@
-from utils.utilidades import printdbg
+import logging
+from utils.utilidades import copy_text_buffer, get_temporada_atual, COPY_BUFFER_SIZE
+
+logger = logging.getLogger(__name__)
+
+_DESTAQUES_COLUMNS = 'atleta_id, posicao, posicao_abreviacao, clube_id, clube, apelido, preco_editorial, escalacoes'
+
+# Possíveis chaves de escalações, no item do destaque e dentro de 'Atleta'
+_ESC_KEYS = ('escalacoes', 'escalações', 'Escalacoes', 'Escalações')
+
+def _pick(d, keys):
+    """Primeiro valor não nulo de d entre as chaves informadas."""
+    for k in keys:
+        v = d.get(k)
+        if v is not None:
+            return v
+    return None
 
 def update_destaques(conn, destaques_data, rodada_atual=None):
     cursor = conn.cursor()
 
     # Validar se os dados são uma lista
     if not isinstance(destaques_data, list):
-        printdbg(f"Erro: Formato de dados inválido para destaques. Esperado: lista, Recebido: {type(destaques_data)}")
-        printdbg(f"Conteúdo recebido: {destaques_data}")
+        logger.error("Formato de dados inválido para destaques. Esperado: lista, Recebido: %s", type(destaques_data))
+        logger.debug("Conteúdo recebido: %s", destaques_data)
         return
 
-    # Limpar a tabela antes de inserir novos dados
-    cursor.execute('DELETE FROM acf_destaques')
-    conn.commit()
-
+    # Linhas por atleta_id (a última ocorrência vence, como no upsert linha a linha)
+    linhas = {}
     total_processados = 0
     total_erros = 0
 
     for destaque in destaques_data:
         # Verificar se o item é um dicionário com a chave 'Atleta'
         if not isinstance(destaque, dict) or 'Atleta' not in destaque:
-            printdbg(f"Formato de dados inesperado em destaques: {destaque}")
+            logger.warning("Formato de dados inesperado em destaques: %s", destaque)
             total_erros += 1
             continue
 
         try:
             atleta = destaque['Atleta']
             
-            # Debug: verificar estrutura dos dados
-            escalacoes = destaque.get('escalacoes')
-            if escalacoes is None:
-                # Tentar outras possíveis chaves
-                escalacoes = destaque.get('escalações') or destaque.get('Escalacoes') or destaque.get('Escalações')
-                if escalacoes is None and isinstance(atleta, dict):
-                    escalacoes = atleta.get('escalacoes') or atleta.get('escalações') or atleta.get('Escalacoes')
+            escalacoes = _pick(destaque, _ESC_KEYS)
+            if escalacoes is None and isinstance(atleta, dict):
+                escalacoes = _pick(atleta, _ESC_KEYS)
             
-            # Log de debug para o primeiro item
-            if total_processados == 0:
-                printdbg(f"Estrutura do primeiro destaque (debug): {list(destaque.keys())}")
-                printdbg(f"Estrutura do Atleta (debug): {list(atleta.keys()) if isinstance(atleta, dict) else 'Não é dict'}")
-                printdbg(f"Valor de escalacoes encontrado: {escalacoes}")
+            # Log de debug apenas para o primeiro item (listas de chaves só são montadas em DEBUG)
+            if total_processados == 0 and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Estrutura do primeiro destaque: %s", list(destaque.keys()))
+                logger.debug("Estrutura do Atleta: %s", list(atleta.keys()) if isinstance(atleta, dict) else 'Não é dict')
+                logger.debug("Valor de escalacoes encontrado: %s", escalacoes)
             
-            cursor.execute('''
-                INSERT INTO acf_destaques (
-                    atleta_id, posicao, posicao_abreviacao, clube_id, clube, 
-                    apelido, preco_editorial, escalacoes
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (atleta_id) DO UPDATE SET
-                    posicao = EXCLUDED.posicao,
-                    posicao_abreviacao = EXCLUDED.posicao_abreviacao,
-                    clube_id = EXCLUDED.clube_id,
-                    clube = EXCLUDED.clube,
-                    apelido = EXCLUDED.apelido,
-                    preco_editorial = EXCLUDED.preco_editorial,
-                    escalacoes = EXCLUDED.escalacoes
-            ''', (
-                atleta.get('atleta_id'),
+            atleta_id = atleta.get('atleta_id')
+            if atleta_id is None:
+                logger.warning("Destaque sem atleta_id ignorado: %s", destaque)
+                total_erros += 1
+                continue
+            linhas[atleta_id] = (
+                atleta_id,
                 destaque.get('posicao'),
                 destaque.get('posicao_abreviacao'),
                 destaque.get('clube_id'),
@@ -62,73 +64,65 @@ def update_destaques(conn, destaques_data, rodada_atual=None):
                 atleta.get('apelido'),
                 atleta.get('preco_editorial'),
                 escalacoes
-            ))
+            )
             total_processados += 1
         except Exception as e:
-            printdbg(f"Erro ao processar item de destaques: {destaque}")
-            printdbg(f"Detalhes do erro: {e}")
-            import traceback
-            printdbg(f"Traceback: {traceback.format_exc()}")
+            logger.warning("Erro ao processar item de destaques: %s (%s)", destaque, e, exc_info=True)
             total_erros += 1
             continue
 
-    conn.commit()
-    printdbg(f"Tabela 'destaques' atualizada com sucesso. Processados: {total_processados}, Erros: {total_erros}")
+    # Snapshot regenerável a partir da API: o COMMIT único não precisa esperar o fsync do WAL
+    cursor.execute('SET LOCAL synchronous_commit = off')
+
+    # Um COPY para a tabela temporária (sem WAL, descartada no commit) alimenta tanto a
+    # tabela atual quanto o histórico; a sincronização apaga só quem saiu dos destaques,
+    # sem esvaziar a tabela antes
+    cursor.execute('''
+        CREATE TEMP TABLE tmp_destaques (LIKE acf_destaques INCLUDING DEFAULTS) ON COMMIT DROP
+    ''')
+    cursor.copy_expert(f"COPY tmp_destaques ({_DESTAQUES_COLUMNS}) FROM STDIN", copy_text_buffer(linhas.values()),
+                       size=COPY_BUFFER_SIZE)
+    cursor.execute(f'''
+        INSERT INTO acf_destaques ({_DESTAQUES_COLUMNS})
+        SELECT {_DESTAQUES_COLUMNS} FROM tmp_destaques
+        ON CONFLICT (atleta_id) DO UPDATE SET
+            posicao = EXCLUDED.posicao,
+            posicao_abreviacao = EXCLUDED.posicao_abreviacao,
+            clube_id = EXCLUDED.clube_id,
+            clube = EXCLUDED.clube,
+            apelido = EXCLUDED.apelido,
+            preco_editorial = EXCLUDED.preco_editorial,
+            escalacoes = EXCLUDED.escalacoes
+        WHERE (acf_destaques.posicao, acf_destaques.posicao_abreviacao, acf_destaques.clube_id, acf_destaques.clube, acf_destaques.apelido, acf_destaques.preco_editorial, acf_destaques.escalacoes)
+            IS DISTINCT FROM (EXCLUDED.posicao, EXCLUDED.posicao_abreviacao, EXCLUDED.clube_id, EXCLUDED.clube, EXCLUDED.apelido, EXCLUDED.preco_editorial, EXCLUDED.escalacoes)
+    ''')
+    cursor.execute('''
+        DELETE FROM acf_destaques d
+        WHERE NOT EXISTS (SELECT 1 FROM tmp_destaques t WHERE t.atleta_id = d.atleta_id)
+    ''')
     
-    # Também salvar no histórico se rodada_atual fornecida
-    if rodada_atual:
-        try:
-            historico_rows = []
-            for destaque in destaques_data:
-                if not isinstance(destaque, dict) or 'Atleta' not in destaque:
-                    continue
-                
-                atleta = destaque['Atleta']
-                escalacoes = destaque.get('escalacoes')
-                if escalacoes is None:
-                    escalacoes = destaque.get('escalações') or destaque.get('Escalacoes')
-                    if escalacoes is None and isinstance(atleta, dict):
-                        escalacoes = atleta.get('escalacoes') or atleta.get('escalações')
-                
-                historico_rows.append((
-                    atleta.get('atleta_id'),
-                    rodada_atual,
-                    escalacoes or 0,
-                    atleta.get('preco_editorial') or 0,
-                    destaque.get('posicao'),
-                    destaque.get('posicao_abreviacao'),
-                    destaque.get('clube_id'),
-                    destaque.get('clube'),
-                    atleta.get('apelido')
-                ))
-            
-            if historico_rows:
-                from psycopg2.extras import execute_values
-                from utils.utilidades import get_temporada_atual
-                temporada = get_temporada_atual()
-                
-                # Adicionar temporada em cada linha
-                historico_rows_com_temporada = [row + (temporada,) for row in historico_rows]
-                
-                historico_sql = '''
-                    INSERT INTO acf_destaques_historico (
-                        atleta_id, rodada_id, escalacoes, preco_editorial,
-                        posicao, posicao_abreviacao, clube_id, clube, apelido, temporada
-                    )
-                    VALUES %s
-                    ON CONFLICT (atleta_id, rodada_id) DO UPDATE SET
-                        escalacoes = EXCLUDED.escalacoes,
-                        preco_editorial = EXCLUDED.preco_editorial,
-                        posicao = EXCLUDED.posicao,
-                        posicao_abreviacao = EXCLUDED.posicao_abreviacao,
-                        clube_id = EXCLUDED.clube_id,
-                        clube = EXCLUDED.clube,
-                        apelido = EXCLUDED.apelido,
-                        temporada = EXCLUDED.temporada
-                '''
-                execute_values(cursor, historico_sql, historico_rows_com_temporada, page_size=1000)
-                conn.commit()
-                printdbg(f"Destaques histórico: {len(historico_rows)} registros salvos para rodada {rodada_atual} (temporada {temporada})")
-        except Exception as e:
-            printdbg(f"Erro ao salvar destaques no histórico: {e}")
-            conn.rollback()
\ No newline at end of file
+    # Também salvar no histórico se rodada_atual fornecida (mesmas linhas, direto da temporária)
+    if rodada_atual and linhas:
+        temporada = get_temporada_atual()
+        cursor.execute('''
+            INSERT INTO acf_destaques_historico (
+                atleta_id, rodada_id, escalacoes, preco_editorial,
+                posicao, posicao_abreviacao, clube_id, clube, apelido, temporada
+            )
+            SELECT atleta_id, %s, COALESCE(escalacoes, 0), COALESCE(preco_editorial, 0),
+                   posicao, posicao_abreviacao, clube_id, clube, apelido, %s
+            FROM tmp_destaques
+            ON CONFLICT (atleta_id, rodada_id) DO UPDATE SET
+                escalacoes = EXCLUDED.escalacoes,
+                preco_editorial = EXCLUDED.preco_editorial,
+                posicao = EXCLUDED.posicao,
+                posicao_abreviacao = EXCLUDED.posicao_abreviacao,
+                clube_id = EXCLUDED.clube_id,
+                clube = EXCLUDED.clube,
+                apelido = EXCLUDED.apelido,
+                temporada = EXCLUDED.temporada
+        ''', (rodada_atual, temporada))
+        logger.info("Destaques histórico: %d registros salvos para rodada %s (temporada %s)", len(linhas), rodada_atual, temporada)
+    
+    conn.commit()
+    logger.info("Tabela 'destaques' atualizada com sucesso. Processados: %d, Erros: %d", total_processados, total_erros)
@@ -1,17 +1,26 @@
+from operator import itemgetter
+from psycopg2.extras import execute_values
+from utils.utilidades import EV_PAGE_SIZE
+
+# Quantidade por posição, na ordem das colunas de acf_esquemas
+_POSICOES = itemgetter('ata', 'gol', 'lat', 'mei', 'tec', 'zag')
+
 def update_esquemas(conn, esquemas_data):
     cursor = conn.cursor()
-    for esquema in esquemas_data:
-        cursor.execute('''
-            INSERT INTO acf_esquemas (esquema_id, nome, ata, gol, lat, mei, tec, zag)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (esquema_id) DO UPDATE SET
-                nome = EXCLUDED.nome,
-                ata = EXCLUDED.ata,
-                gol = EXCLUDED.gol,
-                lat = EXCLUDED.lat,
-                mei = EXCLUDED.mei,
-                tec = EXCLUDED.tec,
-                zag = EXCLUDED.zag
-        ''', (esquema['esquema_id'], esquema['nome'], esquema['posicoes']['ata'], esquema['posicoes']['gol'],
-              esquema['posicoes']['lat'], esquema['posicoes']['mei'], esquema['posicoes']['tec'], esquema['posicoes']['zag']))
+    rows = [(e['esquema_id'], e['nome'], *_POSICOES(e['posicoes'])) for e in esquemas_data]
+    # Upsert em lote: uma ida ao banco em vez de um INSERT por esquema
+    execute_values(cursor, '''
+        INSERT INTO acf_esquemas (esquema_id, nome, ata, gol, lat, mei, tec, zag)
+        VALUES %s
+        ON CONFLICT (esquema_id) DO UPDATE SET
+            nome = EXCLUDED.nome,
+            ata = EXCLUDED.ata,
+            gol = EXCLUDED.gol,
+            lat = EXCLUDED.lat,
+            mei = EXCLUDED.mei,
+            tec = EXCLUDED.tec,
+            zag = EXCLUDED.zag
+        WHERE (acf_esquemas.nome, acf_esquemas.ata, acf_esquemas.gol, acf_esquemas.lat, acf_esquemas.mei, acf_esquemas.tec, acf_esquemas.zag)
+            IS DISTINCT FROM (EXCLUDED.nome, EXCLUDED.ata, EXCLUDED.gol, EXCLUDED.lat, EXCLUDED.mei, EXCLUDED.tec, EXCLUDED.zag)
+    ''', rows, page_size=EV_PAGE_SIZE)
     conn.commit()
\ No newline at end of file
@@ -1,20 +1,27 @@
-from utils.utilidades import printdbg
+import logging
+from psycopg2.extras import execute_values
+from utils.utilidades import EV_PAGE_SIZE
+
+logger = logging.getLogger(__name__)
 
 def update_gato_mestre(conn, gato_mestre_data):
     cursor = conn.cursor()
 
     # Validar se os dados são um dicionário
     if not isinstance(gato_mestre_data, dict):
-        printdbg(f"Erro: Formato de dados inválido para gato_mestre. Esperado: dict, Recebido: {type(gato_mestre_data)}")
+        logger.error("Formato de dados inválido para gato_mestre. Esperado: dict, Recebido: %s", type(gato_mestre_data))
         return
 
-    # Limpar a tabela antes de inserir novos dados
-    cursor.execute('DELETE FROM acf_gato_mestre')
-    conn.commit()
+    # Snapshot regenerável a partir da API: o COMMIT não precisa esperar o fsync do WAL.
+    # DELETE e inserção numa transação só (SET LOCAL vale até o commit)
+    cursor.execute('SET LOCAL synchronous_commit = off')
+
+    # Limpar a tabela antes de inserir novos dados: TRUNCATE descarta o heap de uma vez (sem
+    # tombstone por linha no WAL nem VACUUM depois); o lock exclusivo dura só esta transação
+    cursor.execute('TRUNCATE TABLE acf_gato_mestre')
 
     # Inserção em lote para performance
     try:
-        from psycopg2.extras import execute_values
         rows = []
         for atleta_id, data in (gato_mestre_data or {}).items():
             try:
@@ -24,11 +31,12 @@ def update_gato_mestre(conn, gato_mestre_data):
                     data.get('minutos_jogados')
                 ))
             except Exception as e:
-                printdbg(f"Erro ao montar linha gato_mestre: atleta_id={atleta_id}, data={data}, err={e}")
+                logger.warning("Erro ao montar linha gato_mestre: atleta_id=%s, data=%s, err=%s", atleta_id, data, e)
                 continue
 
         if not rows:
-            printdbg("Nenhum dado para inserir em 'gato_mestre'.")
+            conn.commit()
+            logger.info("Nenhum dado para inserir em 'gato_mestre'.")
             return
 
         sql = '''
@@ -38,9 +46,9 @@ def update_gato_mestre(conn, gato_mestre_data):
                 minimo_para_valorizar = EXCLUDED.minimo_para_valorizar,
                 minutos_jogados = EXCLUDED.minutos_jogados
         '''
-        execute_values(cursor, sql, rows, page_size=1000)
+        execute_values(cursor, sql, rows, page_size=EV_PAGE_SIZE)
         conn.commit()
-        printdbg(f"Tabela 'gato_mestre' atualizada com sucesso. Registros: {len(rows)}")
+        logger.info("Tabela 'gato_mestre' atualizada com sucesso. Registros: %d", len(rows))
     except Exception as e:
         conn.rollback()
-        printdbg(f"Erro em inserção em lote de 'gato_mestre': {e}")
\ No newline at end of file
+        logger.error("Erro em inserção em lote de 'gato_mestre': %s", e, exc_info=True)
\ No newline at end of file
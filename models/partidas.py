@@ -1,38 +1,57 @@
-def update_partidas(conn, partidas_data, rodada):
+import logging
+from psycopg2.extras import execute_values
+from utils.utilidades import get_temporada_atual, EV_PAGE_SIZE
+
+logger = logging.getLogger(__name__)
+
+def update_partidas(conn, partidas_data, rodada, commit=True):
     """
     Atualiza partidas de uma rodada.
     Usa ON CONFLICT DO UPDATE para atualizar partidas existentes (ex: placares) 
     e inserir novas se necessário.
     O controle de "já atualizado" é feito no data_fetcher.py.
+    commit=False deixa o commit para quem chama (ex.: database.fast_ingest_tx).
     """
-    from utils.utilidades import get_temporada_atual
     cursor = conn.cursor()
     temporada = get_temporada_atual()
     
     if not partidas_data or 'partidas' not in partidas_data:
-        print(f"Nenhuma partida fornecida para rodada {rodada}")
+        logger.warning("Nenhuma partida fornecida para rodada %s", rodada)
         return
     
-    for partida in partidas_data['partidas']:
-        cursor.execute('''
-            INSERT INTO acf_partidas (partida_id, rodada_id, clube_casa_id, clube_visitante_id, 
-                                            placar_oficial_mandante, placar_oficial_visitante, local, 
-                                            partida_data, valida, timestamp, temporada)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (partida_id) 
-            DO UPDATE SET rodada_id = EXCLUDED.rodada_id, 
-                         clube_casa_id = EXCLUDED.clube_casa_id, 
-                         clube_visitante_id = EXCLUDED.clube_visitante_id, 
-                         placar_oficial_mandante = EXCLUDED.placar_oficial_mandante, 
-                         placar_oficial_visitante = EXCLUDED.placar_oficial_visitante, 
-                         local = EXCLUDED.local, 
-                         partida_data = EXCLUDED.partida_data, 
-                         valida = EXCLUDED.valida, 
-                         timestamp = EXCLUDED.timestamp,
-                         temporada = EXCLUDED.temporada
-        ''', (partida['partida_id'], rodada, partida['clube_casa_id'], partida['clube_visitante_id'],
-              partida['placar_oficial_mandante'], partida['placar_oficial_visitante'], partida['local'],
-              partida['partida_data'], partida['valida'], partida['timestamp'], temporada))
+    rows = [
+        (partida['partida_id'], rodada, partida['clube_casa_id'], partida['clube_visitante_id'],
+         partida['placar_oficial_mandante'], partida['placar_oficial_visitante'], partida['local'],
+         partida['partida_data'], partida['valida'], partida['timestamp'], temporada)
+        for partida in partidas_data['partidas']
+    ]
     
-    conn.commit()
-    print(f"Partidas da rodada {rodada} (temporada {temporada}) atualizadas: {len(partidas_data['partidas'])} partidas")
\ No newline at end of file
+    # Upsert em lote: uma ida ao banco em vez de um INSERT por partida; partidas sem
+    # mudança (placar igual) não são reescritas
+    execute_values(cursor, '''
+        INSERT INTO acf_partidas (partida_id, rodada_id, clube_casa_id, clube_visitante_id, 
+                                        placar_oficial_mandante, placar_oficial_visitante, local, 
+                                        partida_data, valida, timestamp, temporada)
+        VALUES %s
+        ON CONFLICT (partida_id) 
+        DO UPDATE SET rodada_id = EXCLUDED.rodada_id, 
+                     clube_casa_id = EXCLUDED.clube_casa_id, 
+                     clube_visitante_id = EXCLUDED.clube_visitante_id, 
+                     placar_oficial_mandante = EXCLUDED.placar_oficial_mandante, 
+                     placar_oficial_visitante = EXCLUDED.placar_oficial_visitante, 
+                     local = EXCLUDED.local, 
+                     partida_data = EXCLUDED.partida_data, 
+                     valida = EXCLUDED.valida, 
+                     timestamp = EXCLUDED.timestamp,
+                     temporada = EXCLUDED.temporada
+        WHERE (acf_partidas.rodada_id, acf_partidas.clube_casa_id, acf_partidas.clube_visitante_id,
+               acf_partidas.placar_oficial_mandante, acf_partidas.placar_oficial_visitante, acf_partidas.local,
+               acf_partidas.partida_data, acf_partidas.valida, acf_partidas.timestamp, acf_partidas.temporada)
+            IS DISTINCT FROM (EXCLUDED.rodada_id, EXCLUDED.clube_casa_id, EXCLUDED.clube_visitante_id,
+               EXCLUDED.placar_oficial_mandante, EXCLUDED.placar_oficial_visitante, EXCLUDED.local,
+               EXCLUDED.partida_data, EXCLUDED.valida, EXCLUDED.timestamp, EXCLUDED.temporada)
+    ''', rows, page_size=EV_PAGE_SIZE)
+    
+    if commit:
+        conn.commit()
+    logger.info("Partidas da rodada %s (temporada %s) atualizadas: %d partidas", rodada, temporada, len(rows))
\ No newline at end of file
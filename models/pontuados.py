@@ -1,69 +1,75 @@
-def update_pontuados(conn, pontuados_data, rodada):
-    from psycopg2.extras import execute_values
-    import time
-    from utils.utilidades import get_temporada_atual
+import logging
+import time
+from utils.utilidades import copy_text_buffer, get_temporada_atual, COPY_BUFFER_SIZE
+
+logger = logging.getLogger(__name__)
+
+_PONTUADOS_COLUMNS = (
+    'atleta_id, rodada_id, clube_id, posicao_id, pontuacao, entrou_em_campo, apelido, foto, '
+    'scout_a, scout_ca, scout_cv, scout_de, scout_ds, scout_fc, scout_fd, scout_ff, scout_fs, '
+    'scout_g, scout_gs, scout_i, scout_sg, temporada'
+)
+
+# Scouts gravados, na ordem das colunas scout_* de _PONTUADOS_COLUMNS
+_SCOUT_KEYS = ('A', 'CA', 'CV', 'DE', 'DS', 'FC', 'FD', 'FF', 'FS', 'G', 'GS', 'I', 'SG')
+_SCOUT_ZEROS = (0,) * len(_SCOUT_KEYS)
+
+# Campos do atleta (após atleta_id/rodada_id) e seus valores padrão, na ordem das colunas
+_ATLETA_KEYS = ('clube_id', 'posicao_id', 'pontuacao', 'entrou_em_campo', 'apelido', 'foto')
+_ATLETA_DEFAULTS = (0, 0, 0.0, False, 'Desconhecido', '')
+
+# Upsert montado uma vez no import a partir da lista de colunas. Linhas idênticas
+# (rodada buscada de novo) não são reescritas: sem versão morta nem registro de WAL
+_CAMPOS_MUTAVEIS = [c for c in _PONTUADOS_COLUMNS.split(', ') if c not in ('atleta_id', 'rodada_id')]
+_UPSERT_PONTUADOS_SQL = f'''
+    INSERT INTO acf_pontuados ({_PONTUADOS_COLUMNS})
+    SELECT {_PONTUADOS_COLUMNS} FROM tmp_pontuados
+    ON CONFLICT (atleta_id, rodada_id) DO UPDATE SET
+        {', '.join(f'{c} = EXCLUDED.{c}' for c in _CAMPOS_MUTAVEIS)}
+    WHERE ({', '.join(f'acf_pontuados.{c}' for c in _CAMPOS_MUTAVEIS)})
+        IS DISTINCT FROM ({', '.join(f'EXCLUDED.{c}' for c in _CAMPOS_MUTAVEIS)})
+'''
+
+def _atleta_vals(atleta):
+    # map com dois iteráveis chama atleta.get(k, padrão) em C, sem generator por atleta
+    return map(atleta.get, _ATLETA_KEYS, _ATLETA_DEFAULTS)
+
+def _scout_vals(scout):
+    return map(scout.get, _SCOUT_KEYS, _SCOUT_ZEROS) if scout else _SCOUT_ZEROS
+
+def update_pontuados(conn, pontuados_data, rodada, commit=True):
     t0 = time.time()
     cursor = conn.cursor()
     temporada = get_temporada_atual()
     
-    # Se já existem pontuações para a rodada, pula
-    cursor.execute('SELECT COUNT(*) FROM acf_pontuados WHERE rodada_id = %s AND temporada = %s', (rodada, temporada))
-    exists_count = cursor.fetchone()[0]
-    if exists_count and exists_count > 0:
-        print(f"Rodada {rodada} já existente em 'pontuados' (temporada {temporada}). Pulando atualização.")
+    # Se já existem pontuações para a rodada, pula (basta achar uma linha pelo índice
+    # idx_pontuados_rodada_temporada, sem contar a rodada inteira)
+    cursor.execute('SELECT 1 FROM acf_pontuados WHERE rodada_id = %s AND temporada = %s LIMIT 1', (rodada, temporada))
+    if cursor.fetchone() is not None:
+        logger.info("Rodada %s já existente em 'pontuados' (temporada %s). Pulando atualização.", rodada, temporada)
         return
 
-    rows = []
-    for atleta_id, atleta in pontuados_data['atletas'].items():
-        scout = (atleta.get('scout', {}) or {})
-        row = (
-            int(atleta_id),
-            rodada,
-            atleta.get('clube_id', 0),
-            atleta.get('posicao_id', 0),
-            atleta.get('pontuacao', 0.0),
-            atleta.get('entrou_em_campo', False),
-            atleta.get('apelido', 'Desconhecido'),
-            atleta.get('foto', ''),
-            scout.get('A', 0), scout.get('CA', 0), scout.get('CV', 0), scout.get('DE', 0), scout.get('DS', 0),
-            scout.get('FC', 0), scout.get('FD', 0), scout.get('FF', 0), scout.get('FS', 0), scout.get('G', 0),
-            scout.get('GS', 0), scout.get('I', 0), scout.get('SG', 0),
-            temporada
-        )
-        rows.append(row)
+    rows = [
+        (int(atleta_id), rodada, *_atleta_vals(atleta), *_scout_vals(atleta.get('scout')), temporada)
+        for atleta_id, atleta in pontuados_data['atletas'].items()
+    ]
 
     if not rows:
-        print(f"Pontuados: nada para inserir na rodada {rodada}")
+        logger.info("Pontuados: nada para inserir na rodada %s", rodada)
         return
 
-    insert_sql = '''
-        INSERT INTO acf_pontuados (
-            atleta_id, rodada_id, clube_id, posicao_id, pontuacao, entrou_em_campo, apelido, foto,
-            scout_a, scout_ca, scout_cv, scout_de, scout_ds, scout_fc, scout_fd, scout_ff, scout_fs,
-            scout_g, scout_gs, scout_i, scout_sg, temporada
-        ) VALUES %s
-        ON CONFLICT (atleta_id, rodada_id) DO UPDATE SET
-            clube_id = EXCLUDED.clube_id,
-            posicao_id = EXCLUDED.posicao_id,
-            pontuacao = EXCLUDED.pontuacao,
-            entrou_em_campo = EXCLUDED.entrou_em_campo,
-            apelido = EXCLUDED.apelido,
-            foto = EXCLUDED.foto,
-            scout_a = EXCLUDED.scout_a,
-            scout_ca = EXCLUDED.scout_ca,
-            scout_cv = EXCLUDED.scout_cv,
-            scout_de = EXCLUDED.scout_de,
-            scout_ds = EXCLUDED.scout_ds,
-            scout_fc = EXCLUDED.scout_fc,
-            scout_fd = EXCLUDED.scout_fd,
-            scout_ff = EXCLUDED.scout_ff,
-            scout_fs = EXCLUDED.scout_fs,
-            scout_g = EXCLUDED.scout_g,
-            scout_gs = EXCLUDED.scout_gs,
-            scout_i = EXCLUDED.scout_i,
-            scout_sg = EXCLUDED.scout_sg,
-            temporada = EXCLUDED.temporada
-    '''
-    execute_values(cursor, insert_sql, rows, page_size=1000)
-    conn.commit()
-    print(f"Pontuados: rodada {rodada}, temporada {temporada}, inseridos/atualizados {len(rows)} em {time.time()-t0:.2f}s")
\ No newline at end of file
+    # As linhas vão num único COPY para uma tabela temporária (sem WAL, descartada no commit)
+    # e de lá para acf_pontuados num só INSERT ... SELECT com upsert
+    cursor.execute('''
+        CREATE TEMP TABLE tmp_pontuados (LIKE acf_pontuados INCLUDING DEFAULTS) ON COMMIT DROP
+    ''')
+    # Formato texto do COPY: NULL (\N) e string vazia continuam distintos, sem ajuste por coluna
+    cursor.copy_expert(
+        f"COPY tmp_pontuados ({_PONTUADOS_COLUMNS}) FROM STDIN",
+        copy_text_buffer(rows), size=COPY_BUFFER_SIZE
+    )
+    cursor.execute(_UPSERT_PONTUADOS_SQL)
+    if commit:
+        conn.commit()
+    logger.info("Pontuados: rodada %s, temporada %s, inseridos/atualizados %d em %.2fs",
+                rodada, temporada, len(rows), time.time() - t0)
\ No newline at end of file
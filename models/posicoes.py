@@ -1,11 +1,18 @@
-def update_posicoes(conn, posicoes_data):
+from psycopg2.extras import execute_values
+from utils.utilidades import EV_PAGE_SIZE
+
+def update_posicoes(conn, posicoes_data, commit=True):
     cursor = conn.cursor()
-    for posicao_id, posicao in posicoes_data.items():
-        cursor.execute('''
-            INSERT INTO acf_posicoes (id, nome, abreviacao)
-            VALUES (%s, %s, %s)
-            ON CONFLICT (id) DO UPDATE SET
-                nome = EXCLUDED.nome,
-                abreviacao = EXCLUDED.abreviacao
-        ''', (int(posicao_id), posicao['nome'], posicao['abreviacao']))
-    conn.commit()
\ No newline at end of file
+    rows = [(int(posicao_id), posicao['nome'], posicao['abreviacao']) for posicao_id, posicao in posicoes_data.items()]
+    # Upsert em lote: uma ida ao banco em vez de um INSERT por posição
+    execute_values(cursor, '''
+        INSERT INTO acf_posicoes (id, nome, abreviacao)
+        VALUES %s
+        ON CONFLICT (id) DO UPDATE SET
+            nome = EXCLUDED.nome,
+            abreviacao = EXCLUDED.abreviacao
+        WHERE (acf_posicoes.nome, acf_posicoes.abreviacao)
+            IS DISTINCT FROM (EXCLUDED.nome, EXCLUDED.abreviacao)
+    ''', rows, page_size=EV_PAGE_SIZE)
+    if commit:
+        conn.commit()
\ No newline at end of file
@@ -1,10 +1,16 @@
-def update_status(conn, status_data):
+from psycopg2.extras import execute_values
+from utils.utilidades import EV_PAGE_SIZE
+
+def update_status(conn, status_data, commit=True):
     cursor = conn.cursor()
-    for status_id, status in status_data.items():
-        cursor.execute('''
-            INSERT INTO acf_status (id, nome)
-            VALUES (%s, %s)
-            ON CONFLICT (id) DO UPDATE SET
-                nome = EXCLUDED.nome
-        ''', (int(status_id), status['nome']))
-    conn.commit()
\ No newline at end of file
+    rows = [(int(status_id), status['nome']) for status_id, status in status_data.items()]
+    # Upsert em lote: uma ida ao banco em vez de um INSERT por status
+    execute_values(cursor, '''
+        INSERT INTO acf_status (id, nome)
+        VALUES %s
+        ON CONFLICT (id) DO UPDATE SET
+            nome = EXCLUDED.nome
+        WHERE acf_status.nome IS DISTINCT FROM EXCLUDED.nome
+    ''', rows, page_size=EV_PAGE_SIZE)
+    if commit:
+        conn.commit()
\ No newline at end of file
@@ -1,12 +1,12 @@
 #!/usr/bin/env python3
 """Script para testar conexão com o banco de dados PostgreSQL"""
 
-from database import get_db_connection, close_db_connection, test_connection
+import database
+from database import get_db_connection, close_db_connection, test_connection, load_env, db_cursor, execute_query
 import os
-from dotenv import load_dotenv
 
 # Carregar variáveis de ambiente
-load_dotenv(encoding='utf-8')
+load_env()
 
 def test_db_connection():
     """Testa a conexão com o banco de dados"""
@@ -35,6 +35,12 @@ def test_db_connection():
         # Tentar algumas queries simples
         conn = get_db_connection()
         if conn:
+            # test_connection() sondou numa sessão read-only; a conexão que volta do pool
+            # (normalmente a mesma) tem de estar gravável de novo
+            if conn.readonly:
+                print("\n❌ Conexão do pool continua read-only após test_connection()")
+                close_db_connection(conn)
+                return False
             try:
                 cursor = conn.cursor()
                 
@@ -79,8 +85,39 @@ def test_db_connection():
         print("   4. Se o banco de dados existe")
         return False
 
+def test_pool_volta_gravavel():
+    """
+    Regressão: um bloco db_cursor(readonly=True) não pode devolver a conexão ao pool
+    ainda read-only. Com um pool de uma conexão só, o INSERT seguinte via execute_query
+    usa obrigatoriamente a mesma conexão da leitura.
+    """
+    print("\n🔁 Testando reuso de conexão após leitura read-only...")
+    pool_original = database.DB_POOL
+    database.DB_POOL = database.ConnectionPool(minconn=1, maxconn=1)
+    try:
+        with db_cursor(readonly=True, cursor_factory=None) as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+        
+        read_only = execute_query('SHOW transaction_read_only', fetch_one=True)
+        ok = (
+            read_only is not None and read_only['transaction_read_only'] == 'off'
+            and execute_query('CREATE TEMP TABLE teste_pool_rw (x INTEGER)') is not None
+            and execute_query('INSERT INTO teste_pool_rw VALUES (1)') == 1
+        )
+        execute_query('DROP TABLE IF EXISTS teste_pool_rw')
+    finally:
+        database.DB_POOL.close()
+        database.DB_POOL = pool_original
+    
+    if ok:
+        print("✅ Conexão voltou ao pool gravável")
+    else:
+        print("❌ Conexão voltou ao pool read-only (escrita falhou)")
+    return ok
+
 if __name__ == '__main__':
-    success = test_db_connection()
+    success = test_db_connection() and test_pool_volta_gravavel()
     exit(0 if success else 1)
 
 
@@ -1,54 +1,180 @@
+import io
+import os
+import threading
+import time
+from datetime import datetime
+from functools import wraps
+from itertools import zip_longest
+
 DEBUG_MODE = True
 
-# Cache para temporada (evita múltiplas requisições)
-_TEMPORADA_CACHE = None
-_TEMPORADA_CACHE_TIMESTAMP = None
+# Cache para temporada (evita múltiplas requisições); o lock garante que threads
+# concorrentes (rodadas em paralelo no DataFetcherService) façam uma única busca
+_TEMPORADA_CACHE = (None, 0.0)  # (temporada, expira em time.monotonic())
 _CACHE_DURATION = 3600  # Cache por 1 hora
+_TEMPORADA_LOCK = threading.Lock()
 
 def get_temporada_atual() -> int:
     """
     Retorna a temporada atual buscando da API de status do Cartola.
-    Usa cache de 1 hora para evitar múltiplas requisições.
+    Usa cache de 1 hora para evitar múltiplas requisições (thread-safe).
     Fallback para ano atual caso a API falhe.
     """
-    import time
-    from datetime import datetime
-    
-    global _TEMPORADA_CACHE, _TEMPORADA_CACHE_TIMESTAMP
+    global _TEMPORADA_CACHE
     
-    # Verificar cache
-    current_time = time.time()
-    if _TEMPORADA_CACHE is not None and _TEMPORADA_CACHE_TIMESTAMP is not None:
-        if current_time - _TEMPORADA_CACHE_TIMESTAMP < _CACHE_DURATION:
-            return _TEMPORADA_CACHE
+    # Caminho rápido sem lock: o cache é uma tupla trocada por inteiro (leitura atômica)
+    temporada, expira = _TEMPORADA_CACHE
+    if temporada is not None and time.monotonic() < expira:
+        return temporada
     
-    # Buscar da API
-    try:
-        from api_cartola import fetch_status_data
-        status_data = fetch_status_data()
-        
-        if status_data and 'temporada' in status_data:
-            temporada = int(status_data['temporada'])
-            # Atualizar cache
-            _TEMPORADA_CACHE = temporada
-            _TEMPORADA_CACHE_TIMESTAMP = current_time
+    with _TEMPORADA_LOCK:
+        # Outra thread pode ter atualizado o cache enquanto esperávamos o lock
+        temporada, expira = _TEMPORADA_CACHE
+        if temporada is not None and time.monotonic() < expira:
             return temporada
-    except Exception as e:
-        printdbg(f"Erro ao buscar temporada da API: {e}. Usando fallback (ano atual)")
-    
-    # Fallback: usar ano atual
-    temporada_fallback = datetime.now().year
-    _TEMPORADA_CACHE = temporada_fallback
-    _TEMPORADA_CACHE_TIMESTAMP = current_time
-    return temporada_fallback
-
-def printdbg(*args):
-    if DEBUG_MODE:
+        
+        temporada = None
+        # Buscar da API
+        try:
+            from api_cartola import fetch_status_data
+            status_data = fetch_status_data()
+            
+            if status_data and 'temporada' in status_data:
+                temporada = int(status_data['temporada'])
+        except Exception as e:
+            printdbg(f"Erro ao buscar temporada da API: {e}. Usando fallback (ano atual)")
+        
+        # Fallback: usar ano atual
+        if temporada is None:
+            temporada = datetime.now().year
+        
+        _TEMPORADA_CACHE = (temporada, time.monotonic() + _CACHE_DURATION)
+        return temporada
+
+def ttl_cache(seconds: float, ttl_func=None):
+    """
+    Cache em memória por argumentos com expiração (TTL).
+    - seconds: TTL padrão de cada entrada
+    - ttl_func: opcional, recebe o valor retornado e devolve o TTL a usar (permite
+      estender a validade conforme o conteúdo, ex.: fechamento do mercado)
+    Resultados None (falhas) não são cacheados. Expõe cache_clear() na função decorada.
+    """
+    def decorator(func):
+        cache = {}
+        lock = threading.Lock()
+
+        @wraps(func)
+        def wrapper(*args):
+            now = time.monotonic()
+            with lock:
+                hit = cache.get(args)
+                if hit is not None and hit[1] > now:
+                    return hit[0]
+            value = func(*args)
+            if value is not None:
+                ttl = ttl_func(value) if ttl_func else seconds
+                with lock:
+                    cache[args] = (value, time.monotonic() + ttl)
+            return value
+
+        def cache_clear():
+            with lock:
+                cache.clear()
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator
+
+class TokenBucket:
+    """
+    Limitador token bucket thread-safe: permite rajadas de até `capacity` chamadas
+    e reabastece `rate` tokens por segundo (relógio monotônico).
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = float(capacity if capacity is not None else max(rate, 1.0))
+        self.tokens = self.capacity
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Consome um token, esperando se necessário. Retorna o tempo total de espera (s)."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+                self.last = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                sleep_time = (1 - self.tokens) / self.rate
+            # Dorme fora do lock para não bloquear o reabastecimento
+            time.sleep(sleep_time)
+            waited += sleep_time
+
+# Linhas por INSERT multi-VALUES nos execute_values dos models. 1000 fica no platô de
+# desempenho; acima de ~10000 por lote o Postgres tende a piorar (statement grande demais)
+EV_PAGE_SIZE = int(os.getenv('EXECUTE_VALUES_PAGE_SIZE', 1000))
+
+# Tamanho dos blocos lidos do buffer e enviados ao servidor por copy_expert (padrão do driver: 8 KiB)
+COPY_BUFFER_SIZE = 1 << 16
+
+_COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+def _copy_field(value) -> str:
+    if value is None:
+        return '\\N'
+    if value is True:
+        return 't'
+    if value is False:
+        return 'f'
+    if isinstance(value, str):
+        return value.translate(_COPY_ESCAPES)
+    return str(value)
+
+def _copy_column(col) -> list:
+    """Codifica uma coluna inteira; colunas homogêneas usam um único conversor em C."""
+    tipos = set(map(type, col))
+    if tipos <= {int} or tipos <= {float}:
+        return list(map(str, col))
+    if tipos <= {str}:
+        return [v.translate(_COPY_ESCAPES) for v in col]
+    return list(map(_copy_field, col))
+
+def copy_text_buffer(rows) -> io.StringIO:
+    """
+    Serializa tuplas no formato texto do COPY (tab entre colunas, \\N para NULL, t/f
+    para booleanos) e devolve um StringIO posicionado no início, pronto para copy_expert.
+    Diferente do CSV, distingue None (NULL) de string vazia.
+    A codificação é feita por coluna (zip das tuplas), o que evita decidir o tipo valor a valor.
+    """
+    colunas = [_copy_column(col) for col in zip(*rows)]
+    buf = io.StringIO()
+    buf.writelines('\t'.join(linha) + '\n' for linha in zip(*colunas))
+    buf.seek(0)
+    return buf
+
+# DEBUG_MODE é constante do módulo: printdbg/print_table são escolhidos no import e,
+# com debug desligado, viram no-op sem testar a flag a cada chamada. Quem monta linhas
+# só para exibir deve fazê-lo dentro de `if is_debug():`.
+if DEBUG_MODE:
+    def printdbg(*args):
         print(" ".join(map(str, args)))
+else:
+    def printdbg(*args):
+        pass
 
 def is_debug() -> bool:
     return DEBUG_MODE
 
+# tqdm é opcional: a importação é tentada uma vez, no import do módulo
+try:
+    from tqdm import tqdm as _tqdm  # type: ignore
+except Exception:
+    _tqdm = None
+
 def get_progress(total: int, desc: str = ""):
     """
     Retorna um objeto de progresso com API semelhante ao tqdm:
@@ -58,10 +184,8 @@ def get_progress(total: int, desc: str = ""):
     Sempre visível (mesmo com DEBUG_MODE False). Se tqdm não estiver disponível,
     faz fallback para uma implementação simples baseada em prints.
     """
-    try:
-        from tqdm import tqdm  # type: ignore
-
-        bar = tqdm(total=total, desc=desc, ncols=80)
+    if _tqdm is not None:
+        bar = _tqdm(total=total, desc=desc, ncols=80)
 
         class TqdmWrapper:
             def update(self, n=1):
@@ -74,53 +198,53 @@ def get_progress(total: int, desc: str = ""):
                 bar.close()
 
         return TqdmWrapper()
-    except Exception:
-        # Fallback simples
-        class SimpleProgress:
-            def __init__(self, total: int, desc: str):
-                self.total = total
-                self.count = 0
-                self.desc = desc
-                if desc:
-                    print(f"[1/{total}] {desc}")
 
-            def update(self, n=1):
-                self.count += n
-                pass  # Sem barra, apenas mensagens por set_description
+    # Fallback simples
+    class SimpleProgress:
+        def __init__(self, total: int, desc: str):
+            self.total = total
+            self.count = 0
+            self.desc = desc
+            if desc:
+                print(f"[1/{total}] {desc}")
 
-            def set_description(self, text: str):
-                # Exibe passo atual
-                cur = min(self.count + 1, self.total)
-                print(f"[{cur}/{self.total}] {text}")
+        def update(self, n=1):
+            self.count += n
+            pass  # Sem barra, apenas mensagens por set_description
 
-            def close(self):
-                print("Concluído.")
+        def set_description(self, text: str):
+            # Exibe passo atual
+            cur = min(self.count + 1, self.total)
+            print(f"[{cur}/{self.total}] {text}")
+
+        def close(self):
+            print("Concluído.")
 
-        return SimpleProgress(total, desc)
+    return SimpleProgress(total, desc)
 
-def print_table(title: str, headers: list[str], rows: list[list], max_rows: int | None = None):
+def _print_table(title: str, headers: list[str], rows: list[list], max_rows: int | None = None):
     """
     Imprime uma tabela simples somente quando DEBUG_MODE=True.
     headers: lista de cabeçalhos
     rows: lista de linhas (listas)
     max_rows: limita número de linhas exibidas
     """
-    if not DEBUG_MODE:
-        return
     if max_rows is not None:
         rows = rows[:max_rows]
 
-    # calcular larguras
-    widths = [len(str(h)) for h in headers]
-    for r in rows:
-        for i, cell in enumerate(r):
-            widths[i] = max(widths[i], len(str(cell)))
+    # Cada célula vira str uma única vez; as larguras saem de uma passada por coluna
+    # (zip_longest: linhas mais curtas que os cabeçalhos não cortam colunas)
+    linhas = [list(map(str, headers))] + [list(map(str, r)) for r in rows]
+    widths = [max(map(len, col)) for col in zip_longest(*linhas, fillvalue='')]
 
     def fmt_row(cols):
-        return " ".join(str(c).ljust(widths[i]) for i, c in enumerate(cols))
+        return " ".join(c.ljust(w) for c, w in zip(cols, widths))
+
+    saida = ["\n=== " + title + " ===", fmt_row(linhas[0]), "-" * (sum(widths) + len(widths) - 1)]
+    saida.extend(map(fmt_row, linhas[1:]))
+    print("\n".join(saida))
+
+def _print_table_noop(title: str, headers: list[str], rows: list[list], max_rows: int | None = None):
+    pass
 
-    print("\n=== " + title + " ===")
-    print(fmt_row(headers))
-    print("-" * (sum(widths) + len(widths) - 1))
-    for r in rows:
-        print(fmt_row(r))
+print_table = _print_table if DEBUG_MODE else _print_table_noop